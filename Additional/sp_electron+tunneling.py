@@ -73,6 +73,16 @@ def generate_maze():
 maze = generate_maze()
 start_time = time.time()
 
+# Open path cells kept in a list for random choice, so teleporting is O(1)
+# instead of a full scan; cells only ever open up here, never close
+open_cells = [(x, y) for y in range(GRID_SIZE) for x in range(GRID_SIZE) if maze[y][x] == 1]
+open_cell_set = set(open_cells)
+
+def add_open_cell(position):
+    if position not in open_cell_set:
+        open_cell_set.add(position)
+        open_cells.append(position)
+
 def draw_maze():
     for row in range(GRID_SIZE):
         for col in range(GRID_SIZE):
@@ -115,6 +125,7 @@ def move_player(dx, dy):
         elif maze[new_y][new_x] == 4:  
             tunneling_probability = min(100, tunneling_probability + 10)
             maze[new_y][new_x] = 1
+            add_open_cell((new_x, new_y))
             player_x, player_y = new_x, new_y
         if maze[new_y][new_x] == 3:  
             print(f"You reached the exit in {int(time.time() - start_time)} seconds!")
@@ -148,9 +159,8 @@ def teleport_player():
     global player_x, player_y, blinking, blink_key_pressed, last_blink_time, blink_timer_frozen
 
     if blink_key_pressed:
-        valid_positions = [(x, y) for y in range(GRID_SIZE) for x in range(GRID_SIZE) if maze[y][x] == 1]
-        if valid_positions:
-            player_x, player_y = random.choice(valid_positions)
+        if open_cells:
+            player_x, player_y = random.choice(open_cells)
         blinking = False  
         last_blink_time = time.time()  
         blink_timer_frozen = False  # Unfreeze the cooldown timer
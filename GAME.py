@@ -1,10 +1,18 @@
 import pygame
-import random
 import time
 import subprocess
 import sys
 import os
 import sqlite3
+from maze_grid import MazeGrid, PATH, EXIT
+from maze_cache import seeded_maze
+from maze_pool import MazePool
+from level_prefetch import prefetch_level
+from maze_renderer import MazeRenderer
+from text_cache import render_text
+from frame_scheduler import FrameScheduler, target_fps, stats_requested
+
+LEVEL_POLL_MS = 500  # How often the hidden menu checks whether the levels have finished
 
 class Color:
     """Constants for colors used in the game"""
@@ -15,6 +23,8 @@ class Color:
     RED = (255, 0, 0)
     PURPLE = (128, 0, 128)
     GRAY = (169, 169, 169)
+    LIGHT_GRAY = (210, 210, 210)
+    DARK_GRAY = (105, 105, 105)
 
 class GameState:
     """Game state constants"""
@@ -25,20 +35,47 @@ class GameState:
     SUCCESS = "success"
 
 class Button:
-    """Button class for UI elements"""
+    """Button class for UI elements; every look is rendered once and then just blitted"""
+    STATE_COLORS = {"normal": Color.GRAY, "hover": Color.LIGHT_GRAY, "disabled": Color.DARK_GRAY}
+    
     def __init__(self, text, x, y, width, height, action):
         self.text = text
         self.rect = pygame.Rect(x, y, width, height)
         self.action = action
+        self.hovered = False
+        self.enabled = True
+        self.images = {}  # (font, state) -> pre-rendered button
+
+    @property
+    def state(self):
+        if not self.enabled:
+            return "disabled"
+        return "hover" if self.hovered else "normal"
+
+    def prerender(self, font):
+        """Render the normal, hover and disabled looks for a font"""
+        label = render_text(font, self.text, Color.BLACK)
+        label_pos = ((self.rect.width - label.get_width()) // 2, (self.rect.height - label.get_height()) // 2)
+        for state, color in self.STATE_COLORS.items():
+            image = pygame.Surface(self.rect.size)
+            image.fill(color)
+            image.blit(label, label_pos)
+            self.images[(font, state)] = image
 
     def draw(self, screen, font):
-        pygame.draw.rect(screen, Color.GRAY, self.rect)
-        label = font.render(self.text, True, Color.BLACK)
-        screen.blit(label, (self.rect.x + (self.rect.width - label.get_width()) // 2, 
-                          self.rect.y + (self.rect.height - label.get_height()) // 2))
+        if (font, self.state) not in self.images:
+            self.prerender(font)
+        screen.blit(self.images[(font, self.state)], self.rect)
+
+    def update_hover(self, pos):
+        """Track the mouse; returns True if the button's look changed"""
+        hovered = self.enabled and self.rect.collidepoint(pos)
+        changed = hovered != self.hovered
+        self.hovered = hovered
+        return changed
 
     def is_clicked(self, pos):
-        return self.rect.collidepoint(pos)
+        return self.enabled and self.rect.collidepoint(pos)
 
 class MusicManager:
     """Handles all music-related functionality"""
@@ -62,6 +99,10 @@ class MusicManager:
             pygame.draw.ellipse(self.icon, Color.WHITE, (30, 25, 10, 10))  # Bottom circle
             pygame.draw.ellipse(self.icon, Color.WHITE, (30, 5, 10, 10))   # Top circle
 
+        # Greyed-out look for when music is off, made once instead of per frame
+        self.faded_icon = self.icon.copy()
+        self.faded_icon.fill((100, 100, 100, 128), special_flags=pygame.BLEND_RGBA_MULT)
+
         self.icon_rect = None
         pygame.mixer.music.set_volume(0.5)
         
@@ -107,64 +148,34 @@ class MusicManager:
     
     def draw(self, screen):
         """Draw the music icon"""
-        if self.enabled:
-            screen.blit(self.icon, self.icon_rect)
-        else:
-            faded_icon = self.icon.copy()
-            faded_icon.fill((100, 100, 100, 128), special_flags=pygame.BLEND_RGBA_MULT)
-            screen.blit(faded_icon, self.icon_rect)
+        screen.blit(self.icon if self.enabled else self.faded_icon, self.icon_rect)
 
 class MazeGenerator:
     """Generates and manages the maze"""
-    def __init__(self, grid_size):
+    def __init__(self, grid_size, algorithm="backtracker", seed=None):
         self.grid_size = grid_size
-        self.maze = []
+        self.algorithm = algorithm  # Any name registered in maze_generators
+        self.seed = seed  # Same seed, same maze (cached on disk)
+        self.maze = MazeGrid(grid_size)
+        self.renderer = None  # Cached static maze layer, built on the first draw
         
     def generate(self):
-        """Generate a new random maze using depth-first search algorithm"""
-        self.maze = [[0 for _ in range(self.grid_size)] for _ in range(self.grid_size)]
-        stack = [(random.randint(0, self.grid_size // 2) * 2, random.randint(0, self.grid_size // 2) * 2)]
-        visited = set(stack)
-        directions = [(0, 2), (2, 0), (0, -2), (-2, 0)]
-        
-        while stack:
-            x, y = stack[-1]
-            random.shuffle(directions)
-            found = False
-            for dx, dy in directions:
-                nx, ny = x + dx, y + dy
-                if 0 <= nx < self.grid_size and 0 <= ny < self.grid_size and (nx, ny) not in visited:
-                    self.maze[y][x] = 1
-                    self.maze[ny][nx] = 1
-                    self.maze[y + dy // 2][x + dx // 2] = 1
-                    stack.append((nx, ny))
-                    visited.add((nx, ny))
-                    found = True
-                    break
-            if not found:
-                stack.pop()
-        
-        # Set start and exit points
-        self.maze[0][0] = 1
-        self.maze[self.grid_size - 1][self.grid_size - 1] = 3
+        """Generate a new random maze using the configured algorithm"""
+        self.maze = seeded_maze(self.grid_size, self.algorithm, self.seed)
+        self.renderer = None
         
         return self.maze
     
     def draw(self, screen, cell_size, player_pos):
-        """Draw the maze and player"""
-        screen.fill(Color.BLACK)
-        
-        # Draw maze cells
-        for y in range(self.grid_size):
-            for x in range(self.grid_size):
-                if self.maze[y][x] == 1:
-                    pygame.draw.rect(screen, Color.WHITE, (x * cell_size, y * cell_size, cell_size, cell_size))
-                elif self.maze[y][x] == 3:
-                    pygame.draw.rect(screen, Color.GREEN, (x * cell_size, y * cell_size, cell_size, cell_size))
+        """Draw the player over the cached maze and return the renderer for the rest of the frame"""
+        if self.renderer is None or self.renderer.screen is not screen or self.renderer.cell_size != cell_size:
+            self.renderer = MazeRenderer(screen, self.maze, cell_size, {PATH: Color.WHITE, EXIT: Color.GREEN})
+        self.renderer.begin_frame()
         
         # Draw player
         player_x, player_y = player_pos
-        pygame.draw.rect(screen, Color.BLUE, (player_x * cell_size, player_y * cell_size, cell_size, cell_size))
+        self.renderer.draw_cell(player_x, player_y, Color.BLUE)
+        return self.renderer
 
 class Player:
     """Player class to handle movement and position"""
@@ -209,7 +220,7 @@ class Player:
         
         if dx != 0 or dy != 0:
             new_x, new_y = self.x + dx, self.y + dy
-            if 0 <= new_x < grid_size and 0 <= new_y < grid_size and maze[new_y][new_x] in [1, 3]:
+            if maze.is_walkable(new_x, new_y):
                 self.x, self.y = new_x, new_y
                 self.last_move_time = current_time
                 return True  # Movement occurred
@@ -218,7 +229,7 @@ class Player:
 
     def is_at_exit(self, maze):
         """Check if player has reached the exit"""
-        return maze[self.y][self.x] == 3
+        return maze[self.y, self.x] == EXIT
 
 class UIManager:
     """Manages all UI elements and screens"""
@@ -244,13 +255,38 @@ class UIManager:
         
         self.button_start = Button("Start", 350, 350, 100, 50, "start")
         self.button_continue_success = Button("Continue", 300, 450, 200, 50, "continue_success")
+        
+        # What is on screen right now; menus are only repainted when this changes
+        self.shown_view = None
+    
+    def invalidate(self):
+        """Force the next draw to repaint (e.g. after another window covered ours)"""
+        self.shown_view = None
+    
+    def needs_redraw(self, view):
+        """Record the view about to be shown; False if it is already on screen"""
+        if view == self.shown_view:
+            return False
+        self.shown_view = view
+        return True
+    
+    def update_hover(self, buttons, pos):
+        """Update button hover looks; True if any of them changed"""
+        changed = False
+        for button in buttons:
+            changed = button.update_hover(pos) or changed
+        return changed
     
     def draw_menu(self, buttons, music_manager, show_title=False):
         """Draw a menu screen with buttons"""
+        view = ("menu", id(buttons), show_title, music_manager.enabled, tuple(button.state for button in buttons))
+        if not self.needs_redraw(view):
+            return
+        
         self.screen.fill(Color.BLACK)
         
         if show_title:
-            title_text = self.title_font.render("Quantum Maze", True, Color.WHITE)
+            title_text = render_text(self.title_font, "Quantum Maze", Color.WHITE)
             self.screen.blit(title_text, (self.width // 2 - title_text.get_width() // 2, 100))
         
         for button in buttons:
@@ -261,9 +297,12 @@ class UIManager:
     
     def draw_username_screen(self, username, show_error):
         """Draw the username input screen"""
+        if not self.needs_redraw(("username", username, show_error, self.button_start.state)):
+            return
+        
         self.screen.fill(Color.BLACK)
         
-        title_text = self.title_font.render("Enter Username", True, Color.WHITE)
+        title_text = render_text(self.title_font, "Enter Username", Color.WHITE)
         self.screen.blit(title_text, (self.width // 2 - title_text.get_width() // 2, 150))
         
         pygame.draw.rect(self.screen, Color.WHITE, (250, 250, 300, 50))
@@ -273,7 +312,7 @@ class UIManager:
         self.button_start.draw(self.screen, self.font)
         
         if show_error:
-            error_text = self.font.render("Username cannot be empty!", True, Color.RED)
+            error_text = render_text(self.font, "Username cannot be empty!", Color.RED)
             self.screen.blit(error_text, (self.width // 2 - error_text.get_width() // 2, 
                                         self.button_start.rect.bottom + 20))
         
@@ -281,19 +320,23 @@ class UIManager:
     
     def draw_game_screen(self, maze_generator, player, start_time):
         """Draw the main game screen with maze and timer"""
-        maze_generator.draw(self.screen, self.width // maze_generator.grid_size, (player.x, player.y))
+        self.shown_view = "game"
+        renderer = maze_generator.draw(self.screen, self.width // maze_generator.grid_size, (player.x, player.y))
         
         elapsed_time = int(time.time() - start_time)
-        timer_text = self.font.render(f"Time: {elapsed_time}s", True, Color.RED)
-        self.screen.blit(timer_text, (10, 10))
+        timer_text = render_text(self.font, f"Time: {elapsed_time}s", Color.RED)
+        renderer.blit(timer_text, (10, 10))
         
-        pygame.display.update()
+        renderer.present()
     
     def draw_success_screen(self, final_time):
         """Draw the success screen"""
+        if not self.needs_redraw(("success", final_time, self.button_continue_success.state)):
+            return
+        
         self.screen.fill(Color.BLACK)
         
-        success_text = self.title_font.render("Quantum Success!", True, Color.GREEN)
+        success_text = render_text(self.title_font, "Quantum Success!", Color.GREEN)
         time_text = self.font.render(f"You escaped the Quantum Maze in {final_time} seconds", True, Color.WHITE)
         
         self.screen.blit(success_text, (self.width//2 - success_text.get_width()//2, 300))
@@ -327,6 +370,13 @@ class Game:
         self.maze_generator = MazeGenerator(self.grid_size)
         self.player = Player()
         
+        # Build the level mazes in the background while the menu is up
+        self.maze_pool = MazePool(self.grid_size)
+        self.maze_pool.start()
+        
+        # Capped frame rate during play, blocking waits on the static screens
+        self.scheduler = FrameScheduler(target_fps(), report=stats_requested())
+        
         # Game state variables
         self.current_state = GameState.MENU
         self.username = ""
@@ -413,7 +463,8 @@ class Game:
             # Keep the main window "paused" (black) while Level 1 runs
             level1_active = True
             while level1_active and self.running:
-                for event in pygame.event.get():
+                # Sleep until an event arrives or the next check is due
+                for event in self.scheduler.next_events(active=False, timeout_ms=LEVEL_POLL_MS):
                     if event.type == pygame.QUIT:
                         self.running = False
                         level1_active = False
@@ -425,15 +476,16 @@ class Game:
                     except Exception as e:
                         print(f"Error removing signal file: {e}")
                     level1_active = False
-                    
-                # Check if Level 1 window is still open (optional)
-                pygame.time.delay(100)  # Prevent high CPU usage
+                
+                # Replace the mazes the levels have taken
+                self.maze_pool.refill()
                 
         except Exception as e:
             print(f"Error launching Level 1: {e}")
         
         # When Level 1 closes, return to menu
         self.current_state = GameState.MENU
+        self.ui_manager.invalidate()
         if self.music_manager.enabled:
             self.music_manager.resume()
     
@@ -448,6 +500,8 @@ class Game:
                 if button.action == "new_game":
                     self.current_state = GameState.USERNAME
                     self.username = ""
+                    # Warm Level 1's files while the name is typed; the pool already has its mazes
+                    prefetch_level(1, self.grid_size, maze=False)
                 elif button.action == "leaderboard":
                     # Show leaderboard when options is clicked
                     try:
@@ -481,6 +535,8 @@ class Game:
             if button.is_clicked(pos):
                 if button.action == "continue":
                     self.current_state = GameState.RUNNING
+                    if self.maze_generator.renderer is not None:
+                        self.maze_generator.renderer.invalidate()  # The menu covered the maze
                     if self.music_manager.enabled:
                         self.music_manager.pause()
                 elif button.action == "new_game":
@@ -494,6 +550,16 @@ class Game:
         if self.ui_manager.button_continue_success.is_clicked(pos):
             self.current_state = GameState.MENU
     
+    def handle_mouse_motion(self, pos):
+        """Update the hover look of the buttons on the current screen"""
+        buttons = {
+            GameState.MENU: self.ui_manager.buttons_main_menu,
+            GameState.USERNAME: [self.ui_manager.button_start],
+            GameState.PAUSED: self.ui_manager.buttons_pause_menu,
+            GameState.SUCCESS: [self.ui_manager.button_continue_success],
+        }.get(self.current_state, [])
+        self.ui_manager.update_hover(buttons, pos)
+    
     def handle_username_key(self, event):
         """Handle keyboard input in username screen"""
         if event.key == pygame.K_BACKSPACE:
@@ -550,8 +616,8 @@ class Game:
             elif self.current_state == GameState.SUCCESS:
                 self.ui_manager.draw_success_screen(self.final_time)
             
-            # Process events
-            for event in pygame.event.get():
+            # Process events; only gameplay animates, the other screens wait for input
+            for event in self.scheduler.next_events(active=self.current_state == GameState.RUNNING):
                 if event.type == pygame.QUIT:
                     self.running = False
                 elif event.type == pygame.MOUSEBUTTONDOWN:
@@ -571,7 +637,12 @@ class Game:
                 elif event.type == pygame.KEYUP:
                     if self.current_state == GameState.RUNNING:
                         self.handle_running_key(event, False)
+                elif event.type == pygame.MOUSEMOTION:
+                    self.handle_mouse_motion(event.pos)
+                elif event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+                    self.ui_manager.invalidate()
         
+        self.maze_pool.shutdown()
         pygame.quit()
 
 if __name__ == "__main__":
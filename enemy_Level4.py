@@ -7,7 +7,16 @@ import subprocess
 import sys
 import os
 import sqlite3
-import cv2  # Added OpenCV for video handling just like in Level 5
+import tutorial_video
+import numpy as np
+from maze_grid import OpenCellIndex, WALL, PATH, EXIT
+from maze_pool import take_level_maze
+from text_cache import render_text
+from maze_renderer import MazeRenderer, BlinkNoise
+from level_rules import LEVEL_PARAMS
+from fixed_timestep import FixedTimestep, HeldKeys, TICK_RATE
+from frame_scheduler import FrameScheduler, target_fps, stats_requested
+from level_prefetch import TitleCard, prefetch_level
 
 # Initialize Pygame
 pygame.init()
@@ -15,6 +24,7 @@ pygame.init()
 # Screen settings - Increased from 600x600 to 800x800
 WIDTH, HEIGHT = 800, 800
 GRID_SIZE = 21
+MAZE_ALGORITHM = "backtracker"  # Any name registered in maze_generators
 CELL_SIZE = WIDTH // GRID_SIZE
 screen = pygame.display.set_mode((WIDTH, HEIGHT))
 pygame.display.set_caption("Quantum Maze Game")
@@ -32,6 +42,9 @@ GRAY = (200, 200, 200)  # Button color when hovered
 BUTTON_COLOR = (200, 200, 200)
 BUTTON_HOVER = (150, 150, 150)
 
+# Enemy rule constants, shared with the headless simulation
+RULES = LEVEL_PARAMS[4]
+
 # Database setup
 db_file = "quantum_maze_data.db"
 
@@ -129,129 +142,11 @@ def show_title_screen():
     text_rect = title_text.get_rect(center=(WIDTH//2, HEIGHT//2))
     screen.blit(title_text, text_rect)
     pygame.display.flip()
-    time.sleep(4)  # Display for 4 seconds
+    return TitleCard(4)  # Display for 4 seconds; stays up while the level loads behind it
 
-# Function to show tutorial video with OpenCV (copied from Level 5 and modified)
+# Function to show the tutorial video, from the frame cache once it has been played
 def show_tutorial_video():
-    # Create a start button
-    button_rect = pygame.Rect(WIDTH // 2 - 60, HEIGHT - 70, 120, 40)
-    
-    video_path = "4.mp4"  # Changed to 4.mp4 for Level 4
-    
-    # Check if video file exists
-    if not os.path.exists(video_path):
-        print(f"Error: Video file '{video_path}' not found.")
-        return False  # Skip video and start the game
-    
-    try:
-        # Open the video file with OpenCV
-        cap = cv2.VideoCapture(video_path)
-        if not cap.isOpened():
-            print("Error opening video file")
-            return False
-        
-        # Get video properties
-        frame_width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-        frame_height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-        fps = cap.get(cv2.CAP_PROP_FPS)
-        
-        # Calculate scaling to fit video on screen
-        max_video_height = HEIGHT - 150  # Leave more space for title and button
-        scale = min(WIDTH / frame_width, max_video_height / frame_height)
-        display_width = int(frame_width * scale)
-        display_height = int(frame_height * scale)
-        
-        # Calculate position to center video - move it down to leave space for title
-        video_x = (WIDTH - display_width) // 2
-        video_y = (HEIGHT - display_height - 100) // 2 + 30  # Add offset to push video down
-        
-        # Position for the tutorial text - ensure it's higher than the video
-        tutorial_text_y = video_y - 30
-        
-        # For controlling video timing
-        clock = pygame.time.Clock()
-        last_frame_time = time.time() * 1000  # Current time in milliseconds
-        frame_time = 1000 / fps if fps > 0 else 33  # milliseconds per frame
-        
-        running = True
-        while running:
-            # Handle events
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    cap.release()
-                    pygame.quit()
-                    sys.exit()
-                elif event.type == pygame.MOUSEBUTTONDOWN:
-                    if button_rect.collidepoint(event.pos):
-                        running = False  # Start the game
-            
-            # Strictly control frame timing to ensure constant playback speed
-            current_time = time.time() * 1000
-            if current_time - last_frame_time >= frame_time:
-                # Read the next frame
-                ret, frame = cap.read()
-                
-                # If the video ended, loop back to beginning
-                if not ret:
-                    cap.set(cv2.CAP_PROP_POS_FRAMES, 0)  # Rewind to beginning
-                    ret, frame = cap.read()
-                    if not ret:  # If still can't read, there's a problem
-                        break
-                
-                # Apply rotation (90 degrees clockwise) and vertical flip transformations
-                # 1. Rotate 90 degrees clockwise
-                # Apply rotation (90 degrees counterclockwise two times)
-                frame = cv2.rotate(frame, cv2.ROTATE_90_COUNTERCLOCKWISE)  # First rotation
-                # Second rotation
-
-                # 2. Flip vertically (up/down)
-                frame = cv2.flip(frame, 0)
-                
-                # Convert OpenCV BGR to RGB for Pygame
-                frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                
-                # Resize for display
-                frame = cv2.resize(frame, (display_width, display_height))
-                
-                # Convert to Pygame surface
-                video_surf = pygame.Surface((display_width, display_height))
-                pygame.surfarray.blit_array(video_surf, frame)
-                
-                # Clear screen
-                screen.fill(BLACK)
-                
-                # Add "Tutorial - Level 4" text - draw this BEFORE the video
-                tutorial_text = font.render("Tutorial - Level 4", True, WHITE)  # Changed to Level 4
-                tutorial_text_rect = tutorial_text.get_rect(center=(WIDTH // 2, tutorial_text_y))
-                screen.blit(tutorial_text, tutorial_text_rect)
-                
-                # Display video frame
-                screen.blit(video_surf, (video_x, video_y))
-                
-                # Draw start button
-                mouse_pos = pygame.mouse.get_pos()
-                button_color = BUTTON_HOVER if button_rect.collidepoint(mouse_pos) else BUTTON_COLOR
-                pygame.draw.rect(screen, button_color, button_rect)
-                button_text = button_font.render("Start", True, BLACK)
-                text_rect = button_text.get_rect(center=button_rect.center)
-                screen.blit(button_text, text_rect)
-                
-                pygame.display.update()
-                
-                # Update the last frame time
-                last_frame_time = current_time
-            
-            # Only tick at a high rate to handle events responsively,
-            # but actual frame display is controlled by our manual timing
-            clock.tick(60)
-        
-        # Clean up
-        cap.release()
-        return True
-        
-    except Exception as e:
-        print(f"Error playing video: {e}")
-        return False  # Skip video and start the game
+    return tutorial_video.show_tutorial_video(screen, "4.mp4", "Tutorial - Level 4", font, button_font, tutorial)
 
 def show_game_over_screen():
     """Show game over screen when player is caught by enemy"""
@@ -356,8 +251,14 @@ def show_congrats_screen(elapsed_time):
         
         pygame.display.flip()
 
-# Show the title screen before anything else
-show_title_screen()
+def generate_maze():
+    return take_level_maze(4, GRID_SIZE, MAZE_ALGORITHM)
+
+# Show the title screen before anything else; the tutorial and the maze load while it is up
+title_card = show_title_screen()
+tutorial = tutorial_video.preload(screen, "4.mp4")
+maze = generate_maze()
+title_card.hold()
 
 # Show tutorial video before game begins
 # Add this call after the title screen
@@ -365,45 +266,22 @@ if show_tutorial_video():
     # Reset start_time after the tutorial video
     start_time = time.time()
 
-def generate_maze():
-    maze = [[0 for _ in range(GRID_SIZE)] for _ in range(GRID_SIZE)]
-    stack = [(random.randint(0, GRID_SIZE // 2) * 2, random.randint(0, GRID_SIZE // 2) * 2)]  # Start at a random even cell
-    visited = set(stack)
-    
-    directions = [(0, 2), (2, 0), (0, -2), (-2, 0)]
-    while stack:
-        x, y = stack[-1]
-        random.shuffle(directions)
-        found = False
-        for dx, dy in directions:
-            nx, ny = x + dx, y + dy
-            if 0 <= nx < GRID_SIZE and 0 <= ny < GRID_SIZE and (nx, ny) not in visited:
-                maze[y][x] = 1  # Mark as path
-                maze[ny][nx] = 1  # Mark new position as path
-                maze[y + dy // 2][x + dx // 2] = 1  # Break the wall between
-                stack.append((nx, ny))
-                visited.add((nx, ny))
-                found = True
-                break
-        if not found:
-            stack.pop()
-    
-    # Ensure start and exit points are open
-    maze[0][0] = 1  # Start position
-    maze[GRID_SIZE - 1][GRID_SIZE - 1] = 3  # Exit point
-    return maze
+# Gameplay starts here: Level 5 warms up while this one is played
+prefetch_level(5)
 
 # Initialize player position
 player_x, player_y = 0, 0
-maze = generate_maze()
+previous_player = (player_x, player_y)  # Positions before the last tick, for smooth drawing
+renderer = MazeRenderer(screen, maze, CELL_SIZE, {PATH: WHITE, EXIT: GREEN})
+blink_noise = BlinkNoise(maze.cells.shape)
 start_time = time.time()
 
 # Initialize enemy position
-enemy_x, enemy_y = random.randint(1, GRID_SIZE - 2), random.randint(1, GRID_SIZE - 2)
-while maze[enemy_y][enemy_x] != 1:
-    enemy_x, enemy_y = random.randint(1, GRID_SIZE - 2), random.randint(1, GRID_SIZE - 2)
+enemy_x, enemy_y = OpenCellIndex.of(maze, PATH, margin=1).choice()
 
-keys_pressed = {pygame.K_w: False, pygame.K_s: False, pygame.K_a: False, pygame.K_d: False}
+previous_enemy = (enemy_x, enemy_y)
+
+keys_pressed = HeldKeys((pygame.K_w, pygame.K_s, pygame.K_a, pygame.K_d))
 
 enemy_move_counter = 0  # Controls enemy speed
 quantum_tunneling = False
@@ -414,7 +292,7 @@ tunnel_effect = 0
 teleport_timer = 0
 blinking = False
 blink_timer = 0
-blink_states = {}  # Dictionary to store random blink states for each cell
+blink_mask = None  # Random [y, x] blink state of every cell, redrawn every 5 ticks
 enemy_blink_state = False  # Track enemy's blink state
 
 def distance(x1, y1, x2, y2):
@@ -422,17 +300,12 @@ def distance(x1, y1, x2, y2):
 
 def get_closer_white_blocks(current_x, current_y, target_x, target_y):
     """Returns all white blocks that are closer to the player than the enemy's current position"""
-    closer_blocks = []
     current_dist = distance(current_x, current_y, target_x, target_y)
     
-    for y in range(GRID_SIZE):
-        for x in range(GRID_SIZE):
-            if maze[y][x] in [1, 3]:  # It's a white block (path or exit)
-                new_dist = distance(x, y, target_x, target_y)
-                if new_dist < current_dist:
-                    closer_blocks.append((x, y))
+    white_blocks = maze.cells_of(PATH, EXIT)  # Path or exit cells
+    new_dist = np.hypot(white_blocks[:, 0] - target_x, white_blocks[:, 1] - target_y)
     
-    return closer_blocks
+    return [tuple(block) for block in white_blocks[new_dist < current_dist].tolist()]
 
 def teleport_enemy():
     global enemy_x, enemy_y
@@ -441,46 +314,36 @@ def teleport_enemy():
         enemy_x, enemy_y = random.choice(closer_blocks)
 
 def draw_maze():
-    for row in range(GRID_SIZE):
-        for col in range(GRID_SIZE):
-            if maze[row][col] == 1:  # Path
-                if blinking:
-                    # Each cell has its own random blink state
-                    if (col, row) not in blink_states:
-                        blink_states[(col, row)] = random.choice([True, False])
-                    color = DARK_RED if blink_states[(col, row)] else WHITE
-                else:
-                    color = WHITE  # Normal white
-            elif maze[row][col] == 3:
-                color = GREEN  # Exit
-            else:
-                color = BLACK  # Walls
-            pygame.draw.rect(screen, color, (col * CELL_SIZE, row * CELL_SIZE, CELL_SIZE, CELL_SIZE))
+    # The static maze is cached in the renderer; only what changes is drawn here
+    renderer.begin_frame()
+    if blinking:
+        # Each path cell has its own random blink state
+        renderer.draw_noise(blink_mask, (PATH,), DARK_RED)
     
     # Draw the player in blue
-    pygame.draw.rect(screen, BLUE, (player_x * CELL_SIZE, player_y * CELL_SIZE, CELL_SIZE, CELL_SIZE))
+    renderer.draw_moving_cell(previous_player, (player_x, player_y), timestep.alpha, BLUE)
     
     # Draw the enemy - blinking during teleport phase
     if blinking:
         enemy_color = DARK_RED if enemy_blink_state else WHITE
     else:
         enemy_color = RED
-        if quantum_tunneling and maze[enemy_y][enemy_x] == 0:  # Only turn yellow if on a wall
+        if quantum_tunneling and maze[enemy_y, enemy_x] == WALL:  # Only turn yellow if on a wall
             enemy_color = YELLOW
             
-    pygame.draw.rect(screen, enemy_color, (enemy_x * CELL_SIZE, enemy_y * CELL_SIZE, CELL_SIZE, CELL_SIZE))
+    renderer.draw_moving_cell(previous_enemy, (enemy_x, enemy_y), timestep.alpha, enemy_color)
     
     # Draw the timer
     elapsed_time = int(time.time() - start_time)
-    timer_text = font.render(f"Time: {elapsed_time}s", True, RED)
-    screen.blit(timer_text, (10, 10))
+    timer_text = render_text(font, f"Time: {elapsed_time}s", RED)
+    renderer.blit(timer_text, (10, 10))
 
 def move_player(dx, dy):
     global player_x, player_y
     new_x, new_y = player_x + dx, player_y + dy
-    if 0 <= new_x < GRID_SIZE and 0 <= new_y < GRID_SIZE and maze[new_y][new_x] in [1, 3]:
+    if maze.is_walkable(new_x, new_y):
         player_x, player_y = new_x, new_y
-        if maze[new_y][new_x] == 3:
+        if maze[new_y, new_x] == EXIT:
             elapsed_time = int(time.time() - start_time)
             show_congrats_screen(elapsed_time)
 
@@ -511,15 +374,15 @@ def quantum_tunnel(enemy_x, enemy_y, player_x, player_y):
 
 def move_enemy():
     global enemy_x, enemy_y, enemy_move_counter, quantum_tunneling, tunnel_cooldown, tunnel_effect
-    global teleport_timer, blinking, blink_timer, blink_states, enemy_blink_state
+    global teleport_timer, blinking, blink_timer, blink_mask, enemy_blink_state
     
     # Handle teleportation timing
     teleport_timer += 1
-    if teleport_timer >= 11 * 10:  # 11 seconds (assuming 10 FPS)
+    if teleport_timer >= RULES["enemy_teleport_interval"] * TICK_RATE:  # Seconds of simulation ticks
         teleport_timer = 0
         blinking = True
         blink_timer = 0
-        blink_states = {}  # Reset blink states
+        blink_mask = blink_noise.next_mask()  # Fresh blink states
         enemy_blink_state = False  # Reset enemy blink state
     
     # Handle blinking effect
@@ -527,16 +390,13 @@ def move_enemy():
         blink_timer += 1
         
         # Randomly toggle blink states for all path cells and enemy
-        if blink_timer % 5 == 0:  # Change blink states every 5 frames (0.5s)
-            for y in range(GRID_SIZE):
-                for x in range(GRID_SIZE):
-                    if maze[y][x] == 1:  # Only for path cells
-                        blink_states[(x, y)] = random.choice([True, False])
+        if blink_timer % RULES["enemy_blink_ticks"] == 0:  # Change blink states every few ticks
+            blink_mask = blink_noise.next_mask()
             enemy_blink_state = not enemy_blink_state  # Toggle enemy blink
         
-        if blink_timer >= 2 * 10:  # 2 seconds of blinking
+        if blink_timer >= RULES["enemy_blink_duration"] * TICK_RATE:  # Seconds of blinking
             blinking = False
-            blink_states = {}
+            blink_mask = None
             teleport_enemy()  # Actually teleport after blinking
     
     enemy_move_counter += 1
@@ -546,7 +406,7 @@ def move_enemy():
     if tunnel_effect > 0:
         tunnel_effect -= 1
     
-    if enemy_move_counter >= 6:  # Enemy moves every 6 frames
+    if enemy_move_counter >= RULES["enemy_move_ticks"]:  # Enemy moves every few ticks
         enemy_move_counter = 0
         
         # Don't move normally while blinking (teleportation in progress)
@@ -554,9 +414,9 @@ def move_enemy():
             return
         
         # Decide whether to tunnel (30% chance when not on cooldown)
-        if random.random() < 0.3 and tunnel_cooldown == 0:
+        if random.random() < RULES["enemy_tunnel_chance"] and tunnel_cooldown == 0:
             quantum_tunneling = True
-            tunnel_cooldown = 10  # Cooldown after tunneling
+            tunnel_cooldown = RULES["enemy_tunnel_cooldown"]  # Cooldown after tunneling
             tunnel_effect = 3  # Visual effect duration
         else:
             quantum_tunneling = False
@@ -599,31 +459,19 @@ def bfs_find_next_step(enemy_x, enemy_y, target_x, target_y):
         # Check valid moves
         for dx, dy in directions:
             nx, ny = x + dx, y + dy
-            if (0 <= nx < GRID_SIZE and 0 <= ny < GRID_SIZE and 
-                maze[ny][nx] in [1, 3] and (nx, ny) not in visited):
+            if maze.is_walkable(nx, ny) and (nx, ny) not in visited:
                 queue.append((nx, ny))
                 parent[(nx, ny)] = (x, y)  # Store path
 
     # If BFS fails to find a path, return the current position
     return enemy_x, enemy_y
 
-running = True
-clock = pygame.time.Clock()
-
-while running:
-    screen.fill(BLACK)
-    draw_maze()
-    pygame.display.update()
+def update():
+    """One simulation tick; every enemy timing above is counted in these ticks"""
+    global previous_player, previous_enemy
     
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            running = False
-        elif event.type == pygame.KEYDOWN:
-            if event.key in keys_pressed:
-                keys_pressed[event.key] = True
-        elif event.type == pygame.KEYUP:
-            if event.key in keys_pressed:
-                keys_pressed[event.key] = False
+    previous_player = (player_x, player_y)
+    previous_enemy = (enemy_x, enemy_y)
     
     if keys_pressed[pygame.K_w]:
         move_player(0, -1)
@@ -633,9 +481,30 @@ while running:
         move_player(-1, 0)
     if keys_pressed[pygame.K_d]:
         move_player(1, 0)
+    keys_pressed.end_tick()
     
     move_enemy()  # Move the enemy after the player moves
+
+# Logic runs at TICK_RATE whatever the display frame rate is
+running = True
+timestep = FixedTimestep(TICK_RATE)
+scheduler = FrameScheduler(target_fps(), report=stats_requested())
+
+while running:
+    for event in scheduler.next_events():
+        if event.type == pygame.QUIT:
+            running = False
+        elif event.type == pygame.KEYDOWN:
+            if event.key in keys_pressed:
+                keys_pressed.press(event.key)
+        elif event.type == pygame.KEYUP:
+            if event.key in keys_pressed:
+                keys_pressed.release(event.key)
+    
+    for _ in range(timestep.ticks()):
+        update()
     
-    clock.tick(10)
+    draw_maze()
+    renderer.present()
 
-pygame.quit()
\ No newline at end of file
+pygame.quit()
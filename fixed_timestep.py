@@ -0,0 +1,83 @@
+# fixed_timestep.py - Game logic at a fixed tick rate, independent of the display frame rate
+import time
+
+TICK_RATE = 10  # Simulation ticks per second; level timings were tuned at this rate
+MAX_TICKS_PER_FRAME = 5  # After a longer stall the simulation slows down instead of jumping ahead
+
+class FixedTimestep:
+    """Accumulates elapsed time and releases it as whole simulation ticks.
+
+    Every frame, ticks() says how many fixed-length logic steps are due; what
+    is left over stays in the accumulator, and alpha says how far the display
+    is between the last tick and the next one so drawing can interpolate.
+    The clock is injectable, so a headless run can feed it simulated time and
+    step faster than real time.
+    """
+    def __init__(self, tick_rate=TICK_RATE, max_ticks=MAX_TICKS_PER_FRAME, clock=time.perf_counter):
+        self.tick_rate = tick_rate
+        self.dt = 1.0 / tick_rate
+        self.max_ticks = max_ticks
+        self.clock = clock
+        self.tick_count = 0
+        self.reset()
+
+    def reset(self):
+        """Start accumulating from now, e.g. after a screen that paused the game"""
+        self.accumulator = 0.0
+        self.last_time = self.clock()
+
+    def ticks(self):
+        """Number of simulation ticks to run this frame"""
+        now = self.clock()
+        self.accumulator += now - self.last_time
+        self.last_time = now
+        due = int(self.accumulator * self.tick_rate)
+        if due > self.max_ticks:
+            # Drop the time that cannot be caught up
+            due = self.max_ticks
+            self.accumulator = due * self.dt
+        self.accumulator = max(self.accumulator - due * self.dt, 0.0)
+        self.tick_count += due
+        return due
+
+    @property
+    def alpha(self):
+        """Fraction of a tick that has passed since the last one, in [0, 1]"""
+        return min(self.accumulator * self.tick_rate, 1.0)
+
+    def ticks_for(self, seconds):
+        """Length of a duration in ticks"""
+        return round(seconds * self.tick_rate)
+
+class HeldKeys:
+    """Which movement keys are down, as seen by the simulation tick.
+
+    Events arrive at display rate but movement happens once per tick, so a
+    key pressed and released between two ticks still counts as held for the
+    next one instead of being lost.
+    """
+    def __init__(self, keys):
+        self.held = dict.fromkeys(keys, False)
+        self.tapped = set()
+
+    def __contains__(self, key):
+        return key in self.held
+
+    def __getitem__(self, key):
+        return self.held[key] or key in self.tapped
+
+    def press(self, key):
+        self.held[key] = True
+        self.tapped.add(key)
+
+    def release(self, key):
+        self.held[key] = False
+
+    def clear(self):
+        """Forget every key, e.g. while input is disabled"""
+        self.held = dict.fromkeys(self.held, False)
+        self.tapped.clear()
+
+    def end_tick(self):
+        """Called after every simulation tick has read the keys"""
+        self.tapped.clear()
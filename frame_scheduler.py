@@ -0,0 +1,98 @@
+# frame_scheduler.py - Frame pacing: capped frame rate while animating, asleep on static screens
+import os
+import time
+
+import pygame
+
+DEFAULT_TARGET_FPS = 60
+IDLE_TIMEOUT_MS = 1000  # Longest a static screen sleeps before its loop runs anyway
+REPORT_INTERVAL = 5.0  # Seconds between timing reports
+
+# Frame rate cap for active gameplay and timing reports, e.g.
+#   QUANTUM_MAZE_FPS=30 QUANTUM_MAZE_FRAME_STATS=1 python GAME.py
+FPS_ENV = "QUANTUM_MAZE_FPS"
+STATS_ENV = "QUANTUM_MAZE_FRAME_STATS"
+
+def target_fps(default=DEFAULT_TARGET_FPS):
+    """Frame rate cap requested through the environment, or default"""
+    value = os.environ.get(FPS_ENV, "").strip()
+    if not value:
+        return default
+    try:
+        fps = int(value)
+    except ValueError:
+        fps = 0
+    if fps <= 0:
+        print(f"Ignoring invalid {FPS_ENV} value: {value!r}")
+        return default
+    return fps
+
+def stats_requested():
+    """True if timing reports were switched on through the environment"""
+    return os.environ.get(STATS_ENV, "").strip() not in ("", "0")
+
+class FrameScheduler:
+    """Hands a game loop its events, sleeping first for as long as the screen allows.
+
+    With active=True, next_events() holds the loop to target_fps. With
+    active=False nothing on screen changes on its own, so it blocks in
+    pygame.event.wait until input arrives or the idle timeout passes, and an
+    idle menu costs no CPU at all. The time the loop spends working between
+    calls and the time spent waiting are totalled for timing reports.
+    """
+    def __init__(self, target_fps=DEFAULT_TARGET_FPS, idle_timeout_ms=IDLE_TIMEOUT_MS,
+                 report=False, report_interval=REPORT_INTERVAL):
+        self.frame_duration = 1.0 / target_fps
+        self.idle_timeout_ms = idle_timeout_ms
+        self.report = report
+        self.report_interval = report_interval
+        self.next_frame = time.perf_counter()
+        self.last_wake = self.next_frame
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.frames = 0
+        self.frame_time = 0.0  # Seconds spent in the loop body
+        self.idle_time = 0.0  # Seconds spent waiting in next_events
+        self.stats_start = time.perf_counter()
+
+    def next_events(self, active=True, timeout_ms=None):
+        """Wait for the next frame (active) or for input (static) and return the pending events"""
+        start = time.perf_counter()
+        self.frame_time += start - self.last_wake
+        self.frames += 1
+
+        if active:
+            delay = self.next_frame - start
+            if delay > 0:
+                time.sleep(delay)
+            # A late frame starts the schedule over instead of rushing to catch up
+            self.next_frame = max(self.next_frame, start) + self.frame_duration
+            events = pygame.event.get()
+        else:
+            event = pygame.event.wait(self.idle_timeout_ms if timeout_ms is None else timeout_ms)
+            events = [] if event.type == pygame.NOEVENT else [event]
+            events.extend(pygame.event.get())
+
+        self.last_wake = time.perf_counter()
+        self.idle_time += self.last_wake - start
+        if self.report and self.last_wake - self.stats_start >= self.report_interval:
+            print(self.summary())
+            self.reset_stats()
+        return events
+
+    def stats(self):
+        """Frames, frame rate and average work/wait time per frame (ms) since the last reset"""
+        frames = max(self.frames, 1)
+        elapsed = max(time.perf_counter() - self.stats_start, 1e-9)
+        return {
+            "frames": self.frames,
+            "fps": self.frames / elapsed,
+            "frame_ms": 1000 * self.frame_time / frames,
+            "idle_ms": 1000 * self.idle_time / frames,
+        }
+
+    def summary(self):
+        stats = self.stats()
+        return (f"{stats['frames']} frames, {stats['fps']:.1f} fps, "
+                f"{stats['frame_ms']:.2f} ms working + {stats['idle_ms']:.2f} ms idle per frame")
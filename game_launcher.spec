@@ -5,7 +5,7 @@ a = Analysis(
     ['game_launcher.py'],
     pathex=[],
     binaries=[],
-    datas=[('GAME.py', '.')],
+    datas=[('GAME.py', '.'), ('maze_grid.py', '.'), ('maze_generators.py', '.'), ('maze_cache.py', '.'), ('level_mazes.py', '.'), ('maze_pool.py', '.'), ('maze_buffer.py', '.'), ('maze_packed.py', '.'), ('maze_renderer.py', '.'), ('text_cache.py', '.'), ('frame_scheduler.py', '.'), ('fixed_timestep.py', '.'), ('level_rules.py', '.'), ('tutorial_video.py', '.'), ('level_prefetch.py', '.')],
     hiddenimports=[],
     hookspath=[],
     hooksconfig={},
@@ -3,6 +3,7 @@ import pygame
 import sqlite3
 import sys
 import os
+from frame_scheduler import FrameScheduler, stats_requested
 
 # Initialize Pygame
 pygame.init()
@@ -33,6 +34,8 @@ level_font = pygame.font.Font(None, 26)
 # Database setup
 db_file = "quantum_maze_data.db"
 
+DATA_POLL_MS = 1000  # How often the idle leaderboard checks the database for new results
+
 def init_db():
     """Initialize the database and create the tables if they don't exist"""
     conn = sqlite3.connect(db_file)
@@ -133,40 +136,51 @@ def save_total_time(username, total_time):
     conn.commit()
     conn.close()
 
-def get_leaderboard(limit=10):
-    """Get the top players ordered by total time"""
-    conn = sqlite3.connect(db_file)
-    cursor = conn.cursor()
-    
-    cursor.execute("""
-        SELECT p.username, tt.total_time, tt.completed_date, p.id
-        FROM total_times tt
-        JOIN players p ON tt.player_id = p.id
-        ORDER BY tt.total_time ASC
-        LIMIT ?
-    """, (limit,))
-    
-    results = cursor.fetchall()
-    
-    # Enhanced results with level times
-    enhanced_results = []
-    for username, total_time, completed_date, player_id in results:
-        # Get individual level times
+def get_leaderboard(limit=10, conn=None):
+    """Get the top players ordered by total time, with their level times.
+
+    Two queries on one connection: the top rows, then the level times of
+    all their players at once. Pass conn to reuse an open connection.
+    """
+    own_conn = conn is None
+    if own_conn:
+        conn = sqlite3.connect(db_file)
+    try:
+        cursor = conn.cursor()
+        
         cursor.execute("""
-            SELECT level, completion_time
-            FROM level_times
-            WHERE player_id = ?
-            ORDER BY level
-        """, (player_id,))
+            SELECT p.username, tt.total_time, tt.completed_date, p.id
+            FROM total_times tt
+            JOIN players p ON tt.player_id = p.id
+            ORDER BY tt.total_time ASC
+            LIMIT ?
+        """, (limit,))
         
-        level_times = {level: time for level, time in cursor.fetchall()}
+        results = cursor.fetchall()
         
-        # Add to enhanced results
-        enhanced_results.append((username, total_time, completed_date, level_times))
-    
-    conn.close()
-    
-    return enhanced_results
+        # Individual level times of every listed player
+        player_ids = sorted({player_id for _, _, _, player_id in results})
+        level_times = {player_id: {} for player_id in player_ids}
+        if player_ids:
+            placeholders = ", ".join("?" * len(player_ids))
+            cursor.execute(f"""
+                SELECT player_id, level, completion_time
+                FROM level_times
+                WHERE player_id IN ({placeholders})
+                ORDER BY level
+            """, player_ids)
+            for player_id, level, time in cursor.fetchall():
+                level_times[player_id][level] = time
+    finally:
+        if own_conn:
+            conn.close()
+    
+    return [(username, total_time, completed_date, level_times[player_id])
+            for username, total_time, completed_date, player_id in results]
+
+def data_version(conn):
+    """Counter that changes whenever another connection commits to the database"""
+    return conn.execute("PRAGMA data_version").fetchone()[0]
 
 def format_time(seconds):
     """Format seconds into mm:ss format"""
@@ -174,33 +188,35 @@ def format_time(seconds):
     seconds = seconds % 60
     return f"{minutes:02d}:{seconds:02d}"
 
-def draw_leaderboard():
-    """Draw the leaderboard screen"""
-    screen.fill(BLACK)
+def render_leaderboard(leaderboard_data):
+    """Render the title, headers and rows onto a window-sized surface.
+
+    This is the expensive part of the leaderboard, so it only runs when the
+    data changes; draw_leaderboard just blits the result.
+    """
+    board = pygame.Surface((WIDTH, HEIGHT))
+    board.fill(BLACK)
     
     # Draw title
     title = title_font.render("QUANTUM MAZE LEADERBOARD", True, WHITE)
-    screen.blit(title, (WIDTH//2 - title.get_width()//2, 30))
-    
-    # Get leaderboard data
-    leaderboard_data = get_leaderboard()
+    board.blit(title, (WIDTH//2 - title.get_width()//2, 30))
     
     # Draw headers
     headers = [("Rank", 60), ("Player", 170), ("L1", 250), ("L2", 310), ("L3", 370), ("L4", 430), ("L5", 490), ("Total", 570)]
     
     for header_text, x_pos in headers:
         header = header_font.render(header_text, True, WHITE)
-        screen.blit(header, (x_pos - header.get_width()//2, 90))
+        board.blit(header, (x_pos - header.get_width()//2, 90))
     
     # Draw separator line
-    pygame.draw.line(screen, WHITE, (50, 125), (650, 125), 2)
+    pygame.draw.line(board, WHITE, (50, 125), (650, 125), 2)
     
     # Draw leaderboard entries
     y_position = 140
     for i, (username, total_time, date, level_times) in enumerate(leaderboard_data):
         # Row background for readability (alternate colors)
         if i % 2 == 0:
-            pygame.draw.rect(screen, DARK_GRAY, (50, y_position-5, 600, 35))
+            pygame.draw.rect(board, DARK_GRAY, (50, y_position-5, 600, 35))
         
         # Draw rank with medal for top 3
         rank_text = f"{i+1}"
@@ -218,9 +234,9 @@ def draw_leaderboard():
         name = leaderboard_font.render(username, True, WHITE)
         time = leaderboard_font.render(format_time(total_time), True, WHITE)
         
-        screen.blit(rank, (60 - rank.get_width()//2, y_position))
-        screen.blit(name, (170 - name.get_width()//2, y_position))
-        screen.blit(time, (570 - time.get_width()//2, y_position))
+        board.blit(rank, (60 - rank.get_width()//2, y_position))
+        board.blit(name, (170 - name.get_width()//2, y_position))
+        board.blit(time, (570 - time.get_width()//2, y_position))
         
         # Draw individual level times
         for level in range(1, 6):
@@ -233,21 +249,21 @@ def draw_leaderboard():
             
             level_text = level_font.render(level_time, True, level_color)
             level_x = 250 + (level-1) * 60
-            screen.blit(level_text, (level_x - level_text.get_width()//2, y_position+2))
+            board.blit(level_text, (level_x - level_text.get_width()//2, y_position+2))
         
         y_position += 40
     
-    # Draw button
-    button_rect = pygame.Rect(WIDTH//2 - 100, HEIGHT - 80, 200, 50)
-    mouse_pos = pygame.mouse.get_pos()
-    button_color = DARK_GRAY if button_rect.collidepoint(mouse_pos) else GRAY
+    return board
+
+def draw_leaderboard(board, button_rect, hovered):
+    """Draw the rendered leaderboard and the Main Menu button"""
+    screen.blit(board, (0, 0))
     
+    button_color = DARK_GRAY if hovered else GRAY
     pygame.draw.rect(screen, button_color, button_rect, border_radius=10)
     button_text = button_font.render("Main Menu", True, BLACK)
     text_rect = button_text.get_rect(center=button_rect.center)
     screen.blit(button_text, text_rect)
-    
-    return button_rect
 
 def show_personal_results(username, total_time):
     """Show the player's results before the leaderboard"""
@@ -298,7 +314,9 @@ def show_personal_results(username, total_time):
     
     waiting = True
     while waiting:
-        for event in pygame.event.get():
+        # Nothing on this screen moves, so sleep until there is input
+        event = pygame.event.wait()
+        for event in [event] + pygame.event.get():
             if event.type == pygame.QUIT:
                 pygame.quit()
                 sys.exit()
@@ -317,15 +335,33 @@ def main(username, total_time=None):
         save_total_time(username, total_time)
         show_personal_results(username, total_time)
     
-    # Show leaderboard
+    # Show leaderboard; query once and again only when another process changes the database
+    conn = sqlite3.connect(db_file)
+    version = data_version(conn)
+    leaderboard_data = get_leaderboard(conn=conn)
+    board = render_leaderboard(leaderboard_data)
+    
+    button_rect = pygame.Rect(WIDTH//2 - 100, HEIGHT - 80, 200, 50)
+    hovered = button_rect.collidepoint(pygame.mouse.get_pos())
+    needs_redraw = True
+    scheduler = FrameScheduler(idle_timeout_ms=DATA_POLL_MS, report=stats_requested())
+    
     running = True
     while running:
-        button_rect = draw_leaderboard()
-        pygame.display.update()
+        if needs_redraw:
+            draw_leaderboard(board, button_rect, hovered)
+            pygame.display.update()
+            needs_redraw = False
         
-        for event in pygame.event.get():
+        for event in scheduler.next_events(active=False):
             if event.type == pygame.QUIT:
                 running = False
+            elif event.type == pygame.MOUSEMOTION:
+                if button_rect.collidepoint(event.pos) != hovered:
+                    hovered = not hovered
+                    needs_redraw = True
+            elif event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+                needs_redraw = True
             elif event.type == pygame.MOUSEBUTTONDOWN:
                 if button_rect.collidepoint(event.pos):
                     # Create a signal file that GAME.py can detect
@@ -336,9 +372,21 @@ def main(username, total_time=None):
                         print(f"Error creating signal file: {e}")
                     
                     # Close the leaderboard window
+                    conn.close()
                     pygame.quit()
                     sys.exit()
+        
+        # A finished run elsewhere shows up as a new data version
+        new_version = data_version(conn)
+        if new_version != version:
+            version = new_version
+            new_data = get_leaderboard(conn=conn)
+            if new_data != leaderboard_data:  # e.g. not just a maze pool update
+                leaderboard_data = new_data
+                board = render_leaderboard(leaderboard_data)
+                needs_redraw = True
     
+    conn.close()
     pygame.quit()
 
 if __name__ == "__main__":
@@ -0,0 +1,224 @@
+# level_calibration.py - Plays thousands of seeded games per rule set with bots and reports the outcome
+# Usage: python level_calibration.py LEVEL [name=value,value ...] [--games N] [--bot NAME] [--workers N]
+# e.g.   python level_calibration.py 4 enemy_move_ticks=4,5,6,7 enemy_tunnel_chance=0.2,0.3
+import argparse
+import itertools
+import json
+import os
+import random
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from fixed_timestep import TICK_RATE
+from maze_grid import WALL, EXIT, DOOR
+from level_rules import LEVEL_PARAMS
+from level_simulation import (LevelSimulation, NOOP, TOGGLE_DOOR, MOVES,
+                              UP, DOWN, LEFT, RIGHT, TUNNEL_UP, TUNNEL_DOWN, TUNNEL_LEFT, TUNNEL_RIGHT)
+
+DEFAULT_GAMES = 1000  # Games per rule set
+DEFAULT_MAX_SECONDS = 600  # Games still running after this count as timeouts
+GAMES_PER_JOB = 100
+
+# Values tried around the hand-tuned ones when no sweep is given on the command line
+DEFAULT_SWEEPS = {
+    1: {"teleport_interval": [6, 8, 10, 12, 15]},
+    2: {"teleport_interval": [8, 10, 12], "superposition_duration": [3, 5, 8]},
+    3: {"tunneling_probability": [10, 20, 30], "tunnel_cooldown": [5, 10, 15]},
+    4: {"enemy_move_ticks": [4, 5, 6, 7, 8], "enemy_tunnel_chance": [0.1, 0.3, 0.5]},
+    5: {},
+}
+
+TUNNEL_FOR = {UP: TUNNEL_UP, DOWN: TUNNEL_DOWN, LEFT: TUNNEL_LEFT, RIGHT: TUNNEL_RIGHT}
+
+def exit_distances(maze):
+    """Steps to the exit from every cell that can reach it, doors counted as open"""
+    n = maze.grid_size
+    rows = maze.tolist()
+    queue = deque(tuple(position) for position in maze.cells_of(EXIT).tolist())
+    distances = dict.fromkeys(queue, 0)
+    while queue:
+        x, y = queue.popleft()
+        step = distances[(x, y)] + 1
+        for dx, dy in MOVES.values():
+            nx, ny = x + dx, y + dy
+            if 0 <= nx < n and 0 <= ny < n and rows[ny][nx] != WALL and (nx, ny) not in distances:
+                distances[(nx, ny)] = step
+                queue.append((nx, ny))
+    return distances
+
+class ShortestPathBot:
+    """Heads down the shortest route to the exit and ignores the enemy.
+
+    Superposition doors in the way get measured, closed ones are tunnelled
+    through when the level allows it, and a bot with nothing useful to do
+    takes a random step now and then so it cannot stall forever.
+    """
+    def __init__(self, seed=0, wander=0.1):
+        self.rng = random.Random(seed)
+        self.wander = wander
+        self.maze = None
+        self.distances = None
+
+    def __call__(self, sim):
+        if sim.maze is not self.maze:
+            self.maze = sim.maze
+            self.distances = exit_distances(sim.maze)
+        action = self.best_move(sim)
+        if sim.level == 5:
+            return self.hold(sim, action)
+        if action is None:
+            return self.rng.choice(list(MOVES)) if self.rng.random() < self.wander else NOOP
+        return action
+
+    def best_move(self, sim):
+        """Move (or door action) along the shortest route, None when blocked"""
+        x, y = sim.player
+        best, best_distance = None, self.distances.get((x, y), float("inf"))
+        for action, (dx, dy) in MOVES.items():
+            distance = self.distances.get((x + dx, y + dy))
+            if distance is not None and distance < best_distance:
+                best, best_distance = action, distance
+        if best is None or sim.level not in (2, 3):
+            return best
+
+        dx, dy = MOVES[best]
+        door = (x + dx, y + dy)
+        if sim.maze[door[1], door[0]] != DOOR or sim.door_states.get(door) is True:
+            return best
+        if sim.door_states.get(door) is None:
+            return TOGGLE_DOOR
+        if sim.level == 3 and sim._tunnel_ready():
+            return TUNNEL_FOR[best]
+        return None  # A closed door: wait for it to fall back into superposition
+
+    def hold(self, sim, action):
+        """Level 5 moves while a key is held and every new press reshapes the maze"""
+        if action is None:
+            return sim.last_action if sim.last_action in MOVES else self.rng.choice(list(MOVES))
+        return action
+
+class RandomWalkBot:
+    """Presses a random direction and keeps it for a few ticks; the baseline any rule set should beat"""
+    def __init__(self, seed=0, hold_ticks=5):
+        self.rng = random.Random(seed)
+        self.hold_ticks = hold_ticks
+        self.action = NOOP
+
+    def __call__(self, sim):
+        if sim.tick % self.hold_ticks == 0:
+            self.action = self.rng.choice(list(MOVES))
+        return self.action
+
+BOTS = {"shortest": ShortestPathBot, "random": RandomWalkBot}
+
+def play_games(level, params, bot, seeds, max_ticks, grid_size):
+    """Worker job: play one game per seed, returning (outcome, ticks) for each"""
+    sim = LevelSimulation(level, grid_size=grid_size, params=params)
+    results = []
+    for seed in seeds:
+        sim.reset(seed)
+        observation = sim.run(BOTS[bot](seed), max_ticks)
+        results.append((observation["outcome"] or "timeout", observation["tick"]))
+    return results
+
+def summarize(results):
+    """Outcome rates and the completion time distribution (seconds) of finished games"""
+    games = len(results)
+    outcomes = [outcome for outcome, _ in results]
+    times = np.array([ticks for outcome, ticks in results if outcome == "exit"], dtype=float) / TICK_RATE
+    summary = {
+        "games": games,
+        "exit_rate": outcomes.count("exit") / games,
+        "catch_rate": outcomes.count("caught") / games,
+        "timeout_rate": outcomes.count("timeout") / games,
+    }
+    if len(times):
+        p10, p50, p90 = np.percentile(times, [10, 50, 90])
+        summary.update(mean_time=times.mean(), p10_time=p10, median_time=p50, p90_time=p90)
+    return summary
+
+def rule_sets(level, sweep):
+    """Every combination of the swept values on top of the level's defaults"""
+    names = list(sweep)
+    for values in itertools.product(*(sweep[name] for name in names)):
+        yield dict(zip(names, values))
+
+def calibrate(level, sweep, games=DEFAULT_GAMES, bot="shortest", workers=None,
+              max_seconds=DEFAULT_MAX_SECONDS, grid_size=21, first_seed=0):
+    """Play games per rule set in a process pool; returns [(rule set, summary)].
+
+    Every rule set plays the same seeds, so differences between rows come
+    from the rules rather than from luck of the maze draw.
+    """
+    seeds = list(range(first_seed, first_seed + games))
+    chunks = [seeds[i:i + GAMES_PER_JOB] for i in range(0, len(seeds), GAMES_PER_JOB)]
+    max_ticks = max_seconds * TICK_RATE
+    sets = list(rule_sets(level, sweep))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            [executor.submit(play_games, level, params, bot, chunk, max_ticks, grid_size) for chunk in chunks]
+            for params in sets
+        ]
+        return [
+            (params, summarize([result for future in jobs for result in future.result()]))
+            for params, jobs in zip(sets, futures)
+        ]
+
+def format_report(level, report):
+    """Table with one row per rule set"""
+    lines = [f"Level {level}, defaults: {LEVEL_PARAMS[level]}",
+             f"{'rule set':<44} {'games':>6} {'exit':>6} {'caught':>7} {'timeout':>8} "
+             f"{'mean s':>7} {'p10':>6} {'median':>7} {'p90':>6}"]
+    for params, summary in report:
+        label = ", ".join(f"{name}={value}" for name, value in params.items()) or "defaults"
+        times = (f"{summary['mean_time']:>7.1f} {summary['p10_time']:>6.1f} "
+                 f"{summary['median_time']:>7.1f} {summary['p90_time']:>6.1f}"
+                 if "mean_time" in summary else f"{'-':>7} {'-':>6} {'-':>7} {'-':>6}")
+        lines.append(f"{label:<44} {summary['games']:>6} {summary['exit_rate']:>6.1%} "
+                     f"{summary['catch_rate']:>7.1%} {summary['timeout_rate']:>8.1%} {times}")
+    return "\n".join(lines)
+
+def parse_sweep(level, specs):
+    """name=value,value ... -> {name: [values]}"""
+    sweep = {}
+    for spec in specs:
+        name, _, values = spec.partition("=")
+        if name not in LEVEL_PARAMS[level] or not values:
+            raise ValueError(f"Expected name=value[,value...] with a level {level} parameter "
+                             f"({', '.join(LEVEL_PARAMS[level]) or 'none'}), got {spec!r}")
+        sweep[name] = [json.loads(value) for value in values.split(",")]
+    return sweep
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Calibrate level rules with bot-played games")
+    parser.add_argument("level", type=int, choices=sorted(LEVEL_PARAMS))
+    parser.add_argument("sweep", nargs="*", help="name=value,value ... (default: a sweep around the current rules)")
+    parser.add_argument("--games", type=int, default=DEFAULT_GAMES, help="games per rule set")
+    parser.add_argument("--bot", choices=sorted(BOTS), default="shortest")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--max-seconds", type=int, default=DEFAULT_MAX_SECONDS)
+    parser.add_argument("--json", help="also write the report to this file")
+    args = parser.parse_args(argv)
+
+    try:
+        sweep = parse_sweep(args.level, args.sweep) if args.sweep else DEFAULT_SWEEPS[args.level]
+    except ValueError as e:
+        parser.error(str(e))
+
+    start = time.perf_counter()
+    report = calibrate(args.level, sweep, args.games, args.bot, args.workers, args.max_seconds)
+    print(format_report(args.level, report))
+    total = sum(summary["games"] for _, summary in report)
+    print(f"{total} games in {time.perf_counter() - start:.1f}s on {args.workers} workers")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump([{"params": params, **summary} for params, summary in report], f, indent=2)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
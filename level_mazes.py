@@ -0,0 +1,99 @@
+# level_mazes.py - Builds the maze (plus doors and power-ups) for each level
+import numpy as np
+
+from maze_grid import OpenCellIndex, PATH, DOOR, POWERUP
+from maze_cache import seeded_maze, seeded_rng
+from maze_generators import build_maze
+
+DEFAULT_GRID_SIZE = 21
+DEFAULT_ALGORITHM = "backtracker"
+
+def default_door_pairs(grid_size):
+    """Entangled door pairs for a maze size: 3 on the classic 21x21 grid, growing with the area"""
+    return max(3, 3 * grid_size * grid_size // (DEFAULT_GRID_SIZE * DEFAULT_GRID_SIZE))
+
+def door_candidates(maze):
+    """(N, 2) array of the (x, y) interior path cells with exactly 2 wall neighbours"""
+    candidates = (maze.cells == PATH) & (maze.neighbour_wall_counts() == 2)
+    # Doors never go on the outer ring of the grid
+    candidates[0, :] = candidates[-1, :] = False
+    candidates[:, 0] = candidates[:, -1] = False
+    return np.argwhere(candidates)[:, ::-1]
+
+def place_entangled_doors(maze, rng, max_pairs=None, skip_adjacent=True):
+    """Turn random corridor cells into up to max_pairs entangled door pairs.
+
+    Returns (door_states, entangled_pairs, door_pair_timers) in the shape the
+    door levels use; every door starts in superposition (None).
+    """
+    if max_pairs is None:
+        max_pairs = default_door_pairs(maze.grid_size)
+    door_states = {}
+    door_pair_timers = {}
+    candidates = door_candidates(maze)
+
+    # A random ordering of just the candidates that can be used; large mazes
+    # have millions of candidates, so shuffling all of them would dominate
+    picks = rng.sample(range(len(candidates)), min(max_pairs * 2, len(candidates)))
+    door_positions = [tuple(position) for position in candidates[picks].tolist()]
+    entangled_pairs = []
+
+    for i in range(0, max_pairs * 2, 2):
+        if i + 1 >= len(door_positions):
+            break
+
+        door1, door2 = door_positions[i], door_positions[i + 1]
+        x1, y1 = door1
+        x2, y2 = door2
+
+        # Skip the pair if the doors are next to each other
+        if skip_adjacent and abs(x1 - x2) + abs(y1 - y2) == 1:
+            continue
+
+        maze[y1, x1] = DOOR
+        maze[y2, x2] = DOOR
+        door_states[door1] = None  # Start in superposition
+        door_states[door2] = None  # Start in superposition
+        entangled_pairs.append((door1, door2))
+
+    return door_states, entangled_pairs, door_pair_timers
+
+def place_power_ups(maze, rng, count=3, open_cells=None):
+    """Turn random interior path cells into tunneling power-ups.
+
+    open_cells is an OpenCellIndex of the interior path cells to draw from;
+    it is built from the maze when not given and kept up to date either way.
+    """
+    if open_cells is None:
+        open_cells = OpenCellIndex.of(maze, PATH, margin=1)
+    for _ in range(count):
+        position = open_cells.choice(rng)
+        if position is None:
+            break  # Fewer free cells than power-ups
+        x, y = position
+        maze[y, x] = POWERUP
+        open_cells.cell_changed(position, POWERUP)
+
+def build_level_maze(level, grid_size=DEFAULT_GRID_SIZE, algorithm=DEFAULT_ALGORITHM, seed=None, max_pairs=None,
+                     cached=True):
+    """Build everything a level needs before its first frame.
+
+    Levels 2 and 3 get (maze, door_states, entangled_pairs, door_pair_timers),
+    every other level just the maze. max_pairs defaults to default_door_pairs.
+    cached=False builds a seeded maze in memory instead of going through the
+    maze cache, for bulk runs that would only churn the database.
+    """
+    if cached:
+        maze = seeded_maze(grid_size, algorithm, seed)
+    else:
+        maze = build_maze(grid_size, algorithm, seeded_rng(seed))
+    if level not in (2, 3):
+        return maze
+
+    rng = seeded_rng(seed)  # Door placement is reproducible too
+    if level == 2:
+        door_states, entangled_pairs, door_pair_timers = place_entangled_doors(maze, rng, max_pairs)
+    else:
+        door_states, entangled_pairs, door_pair_timers = place_entangled_doors(maze, rng, max_pairs, skip_adjacent=False)
+        place_power_ups(maze, rng)
+    return maze, door_states, entangled_pairs, door_pair_timers
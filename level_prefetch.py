@@ -0,0 +1,129 @@
+# level_prefetch.py - Loads a level behind its title card and warms the next level while this one is played
+import atexit
+import os
+import threading
+import time
+
+import pygame
+
+import tutorial_video
+from maze_cache import db_file, level_seed
+from level_mazes import build_level_maze, DEFAULT_GRID_SIZE, DEFAULT_ALGORITHM
+
+LEVEL_SCRIPTS = {
+    1: "sp_electron (Level 1).py",
+    2: "sp_doors-Level2.py",
+    3: "sp_door_tunnel-Level3.py",
+    4: "enemy_Level4.py",
+    5: "sp_walls-Level5.py",
+}
+LEVEL_WINDOW = (800, 800)  # Every level opens a window this size
+FIRST_MAZE_INDEX = {5: 1}  # Level 5 counts its mazes from 1
+PREFETCH_FRAMES = 60  # Tutorial frames paged into memory ahead of the next level
+
+# With the frame cache switched on (tutorial_video.CACHE_ENV), a missing
+# entry is normally written the first time its tutorial is watched. Building
+# it ahead of time costs several hundred MB of disk per video, so the
+# prefetcher only does that when asked as well, e.g.
+#   QUANTUM_MAZE_VIDEO_CACHE=2048 QUANTUM_MAZE_PREFETCH_VIDEO=1 python GAME.py
+PREFETCH_VIDEO_ENV = "QUANTUM_MAZE_PREFETCH_VIDEO"
+
+_stopping = threading.Event()  # Set at exit, so a half-built frame cache is cleaned up rather than cut off
+
+class TitleCard:
+    """A title card that stays up for its full time while the level loads behind it.
+
+    The level screens used to sleep through the card and only then open the
+    tutorial and build the maze. Now the loading starts as soon as the card
+    is drawn and hold() sleeps whatever time is left, so the card is pure
+    presentation and the level is ready the moment it goes.
+    """
+    def __init__(self, seconds):
+        self.until = time.time() + seconds
+
+    def hold(self):
+        remaining = self.until - time.time()
+        if remaining > 0:
+            time.sleep(remaining)
+
+def page_in(path, chunk_size=1 << 20):
+    """Read a file once so the next process finds it in the OS file cache"""
+    try:
+        with open(path, "rb") as f:
+            while f.read(chunk_size):
+                pass
+    except OSError:
+        pass
+
+def video_prefetch_requested():
+    """True if building missing frame caches ahead of time was switched on through the environment"""
+    return os.environ.get(PREFETCH_VIDEO_ENV, "").strip() not in ("", "0")
+
+def warm_tutorial(level, window_size=LEVEL_WINDOW, frames=PREFETCH_FRAMES):
+    """Page a level's tutorial into memory: the first frames of its frame cache, or the video file.
+
+    With a cache the next level shows the video without decoding anything
+    or loading OpenCV. Without one the cache is only built if the frame
+    cache is switched on and video_prefetch_requested().
+    """
+    video_path = f"{level}.mp4"
+    if not os.path.exists(video_path):
+        return
+    page_in(video_path)  # The cache lookup hashes it, and a decoder reads it
+    box = tutorial_video.video_box(window_size)
+    cache = tutorial_video.FrameCache.load(video_path, box)
+    if cache is None and video_prefetch_requested():
+        cache = tutorial_video.build_cache(video_path, box, _stopping)
+    if cache is not None:
+        cache.warm(frames)
+        cache.close()  # The pages stay in the OS file cache
+
+def warm_maze(level, grid_size=DEFAULT_GRID_SIZE, algorithm=DEFAULT_ALGORITHM):
+    """Have a seeded session's maze for a level's start waiting in the maze cache.
+
+    Unseeded mazes are left to the menu's MazePool, which alone decides how
+    many to keep.
+    """
+    seed = level_seed(level, FIRST_MAZE_INDEX.get(level, 0))
+    if seed is not None:
+        build_level_maze(level, grid_size, algorithm, seed)
+
+def warm_files(level):
+    """Page in the next process's script, the database and the font file behind pygame's default font"""
+    page_in(LEVEL_SCRIPTS[level])
+    page_in(db_file)
+    page_in(os.path.join(os.path.dirname(pygame.__file__), pygame.font.get_default_font()))
+
+def _warm_level(level, grid_size, algorithm, maze):
+    steps = [warm_files, warm_tutorial]
+    if maze:
+        steps.append(lambda level: warm_maze(level, grid_size, algorithm))
+    for step in steps:
+        if _stopping.is_set():
+            return
+        try:
+            step(level)
+        except Exception as e:
+            print(f"Error prefetching level {level}: {e}")
+
+def _stop_prefetching(thread):
+    _stopping.set()
+    thread.join()
+
+def prefetch_level(level, grid_size=DEFAULT_GRID_SIZE, algorithm=DEFAULT_ALGORITHM, maze=True):
+    """Warm a level's assets on a background thread while the current level is played.
+
+    Call it once play has begun, not behind a title card or a tutorial,
+    which are busy loading and decoding themselves. The levels are separate
+    processes, so nothing can be handed over in memory: the files and the
+    tutorial's frames go into the OS file cache and a seeded maze into the
+    maze cache, where the next process finds them. Unknown levels (after
+    the last one) are ignored.
+    """
+    if level not in LEVEL_SCRIPTS:
+        return None
+    thread = threading.Thread(target=_warm_level, args=(level, grid_size, algorithm, maze),
+                              name=f"prefetch-level-{level}", daemon=True)
+    thread.start()
+    atexit.register(_stop_prefetching, thread)
+    return thread
@@ -0,0 +1,31 @@
+# level_rules.py - Hand-tuned rule constants of every level, shared by the levels and their simulation
+
+# Times are in seconds unless noted
+LEVEL_PARAMS = {
+    1: {
+        "teleport_interval": 10,  # Play time before the electron blurs into superposition
+        "blink_lock": 2,  # Keys stay dead this long after the blur starts
+    },
+    2: {
+        "teleport_interval": 10,
+        "blink_lock": 2,
+        "superposition_duration": 5,  # A measured door pair stays measured this long
+    },
+    3: {
+        "teleport_interval": 15,
+        "blink_lock": 2,
+        "superposition_duration": 5,
+        "tunneling_probability": 20,  # Percent chance that a tunnel attempt goes through
+        "tunnel_cooldown": 10,
+        "power_up_bonus": 10,  # Tunneling percent added per power-up
+    },
+    4: {
+        "enemy_teleport_interval": 11,
+        "enemy_blink_duration": 2,
+        "enemy_blink_ticks": 5,  # Ticks between flicker changes while the enemy blinks
+        "enemy_move_ticks": 6,  # Ticks between enemy steps
+        "enemy_tunnel_chance": 0.3,
+        "enemy_tunnel_cooldown": 10,  # In ticks
+    },
+    5: {},
+}
@@ -0,0 +1,404 @@
+# level_simulation.py - Every level's rules as a headless, steppable simulation
+import random
+from collections import deque
+
+import numpy as np
+
+from fixed_timestep import TICK_RATE
+from maze_grid import OpenCellIndex, PATH, DOOR, EXIT, POWERUP
+from maze_cache import derive_seed
+from level_mazes import build_level_maze, DEFAULT_GRID_SIZE, DEFAULT_ALGORITHM
+from level_rules import LEVEL_PARAMS
+
+# Actions: the key pressed (or held) during one simulation tick
+NOOP = 0
+UP = 1
+DOWN = 2
+LEFT = 3
+RIGHT = 4
+TOGGLE_DOOR = 5  # F in Levels 2 and 3
+TUNNEL_UP = 6  # Space plus a direction in Level 3
+TUNNEL_DOWN = 7
+TUNNEL_LEFT = 8
+TUNNEL_RIGHT = 9
+
+MOVES = {UP: (0, -1), DOWN: (0, 1), LEFT: (-1, 0), RIGHT: (1, 0)}
+TUNNELS = {TUNNEL_UP: (0, -1), TUNNEL_DOWN: (0, 1), TUNNEL_LEFT: (-1, 0), TUNNEL_RIGHT: (1, 0)}
+
+# Step order the Level 4 enemy's breadth-first search tries: down, right, up, left
+HUNTER_DIRECTIONS = ((0, 1), (1, 0), (0, -1), (-1, 0))
+
+class LevelSimulation:
+    """One level's rules without a window, advanced one fixed tick per step().
+
+    reset(seed) builds the level the way a game seeded with QUANTUM_MAZE_SEED
+    = seed would, step(action) applies one tick with the given key pressed,
+    and observe() reports the state. Time is counted in ticks of the game's
+    TICK_RATE, so nothing depends on the wall clock and runs go as fast as
+    the rules can be evaluated. params overrides entries of LEVEL_PARAMS.
+    """
+    def __init__(self, level, grid_size=DEFAULT_GRID_SIZE, algorithm=DEFAULT_ALGORITHM, params=None):
+        if level not in LEVEL_PARAMS:
+            raise ValueError(f"Unknown level {level}, choose one of: {', '.join(map(str, LEVEL_PARAMS))}")
+        unknown = set(params or ()) - set(LEVEL_PARAMS[level])
+        if unknown:
+            raise ValueError(f"Unknown parameters for level {level}: {', '.join(sorted(unknown))}")
+        self.level = level
+        self.grid_size = grid_size
+        self.algorithm = algorithm
+        self.params = {**LEVEL_PARAMS[level], **(params or {})}
+        self._step = getattr(self, f"_step_level{level}")
+
+    def ticks(self, seconds):
+        return round(seconds * TICK_RATE)
+
+    def reset(self, seed=None):
+        """Start a fresh game on the maze of a seed (a random one when seed is None)"""
+        if seed is None:
+            seed = random.getrandbits(63)
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.tick = 0
+        self.done = False
+        self.outcome = None  # "exit" or "caught" once done
+        self.player = (0, 0)
+        self.blinking = False
+        self.keys_enabled = True
+
+        # Level 5 draws a new maze on every key press; the game starts it at maze 1
+        result = self._build_maze(1 if self.level == 5 else 0)
+        if self.level in (2, 3):
+            maze, self.door_states, self.entangled_pairs, self.door_pair_timers = result
+        else:
+            maze = result
+        self._set_maze(maze)
+
+        params = self.params
+        if self.level in (1, 2, 3):
+            self.open_cells = OpenCellIndex.of(maze, PATH)  # Teleport targets
+            self.last_teleport = 0
+            self.blink_start = None
+            self.blink_unlock = 0
+        if self.level == 3:
+            self.tunneling_probability = params["tunneling_probability"]
+            self.last_tunnel = None
+        if self.level == 4:
+            self.enemy = OpenCellIndex.of(maze, PATH, margin=1).choice(self.rng)
+            self.enemy_move_counter = 0
+            self.enemy_tunneling = False
+            self.enemy_tunnel_cooldown = 0
+            self.teleport_timer = 0
+            self.blink_timer = 0
+            self.enemy_blink_state = False
+        if self.level == 5:
+            self.maze_count = 1
+            self.direction = None
+            self.last_action = NOOP
+        return self.observe()
+
+    def _build_maze(self, index):
+        return build_level_maze(self.level, self.grid_size, self.algorithm,
+                                derive_seed(self.seed, self.level, index), cached=False)
+
+    def _set_maze(self, maze):
+        self.maze = maze
+        self.rows = maze.tolist()  # Nested lists index faster than the array in tight loops
+        if self.level == 4:
+            # Walkable neighbours of every cell in search order, for the enemy's searches
+            n = self.grid_size
+            self.neighbours = {
+                (x, y): [(x + dx, y + dy) for dx, dy in HUNTER_DIRECTIONS
+                         if 0 <= x + dx < n and 0 <= y + dy < n and self.rows[y + dy][x + dx] in (PATH, EXIT)]
+                for y in range(n) for x in range(n)
+            }
+
+    def observe(self):
+        """Snapshot of the state a player (or bot) can see; the maze is shared, not copied"""
+        observation = {
+            "level": self.level,
+            "tick": self.tick,
+            "time": self.tick / TICK_RATE,
+            "player": self.player,
+            "done": self.done,
+            "outcome": self.outcome,
+            "blinking": self.blinking,
+            "keys_enabled": self.keys_enabled,
+            "maze": self.maze,
+        }
+        if self.level in (2, 3):
+            observation["doors"] = dict(self.door_states)
+        if self.level == 3:
+            observation["tunneling_probability"] = self.tunneling_probability
+            observation["tunnel_ready"] = self._tunnel_ready()
+        if self.level == 4:
+            observation["enemy"] = self.enemy
+        if self.level == 5:
+            observation["maze_count"] = self.maze_count
+        return observation
+
+    def step(self, action=NOOP):
+        """Advance one tick with action pressed; returns observe()"""
+        if not self.done:
+            self._step(action)
+            self.tick += 1
+        return self.observe()
+
+    def run(self, policy, max_ticks):
+        """Step with policy(simulation) until the level ends or max_ticks pass; returns observe()"""
+        while not self.done and self.tick < max_ticks:
+            self._step(policy(self))
+            self.tick += 1
+        return self.observe()
+
+    # Shared rules
+
+    def _finish(self, outcome):
+        self.done = True
+        self.outcome = outcome
+
+    def _walk(self, dx, dy):
+        """Plain movement onto path and exit cells (Levels 1, 4 and 5)"""
+        x, y = self.player[0] + dx, self.player[1] + dy
+        if 0 <= x < self.grid_size and 0 <= y < self.grid_size and self.rows[y][x] in (PATH, EXIT):
+            self.player = (x, y)
+            if self.rows[y][x] == EXIT:
+                self._finish("exit")
+
+    def _teleport(self):
+        """Collapse the blurred electron onto a random open cell"""
+        position = self.open_cells.choice(self.rng)
+        if position:
+            self.player = position
+        self.keys_enabled = True
+        self.blinking = False
+        self.last_teleport = self.tick
+
+    # Level 1: the electron blurs every few seconds and a key press collapses it somewhere random
+
+    def _step_level1(self, action):
+        params = self.params
+        if action != NOOP and self.blinking and self.keys_enabled:
+            self._teleport()
+            return
+
+        if self.tick - self.last_teleport >= self.ticks(params["teleport_interval"]) and not self.blinking:
+            self.blinking = True
+            self.keys_enabled = False
+            self.blink_start = self.tick
+        if self.blinking and self.tick - self.blink_start >= self.ticks(params["blink_lock"]):
+            self.keys_enabled = True
+
+        if self.keys_enabled and not self.blinking and action in MOVES:
+            self._walk(*MOVES[action])
+
+    # Levels 2 and 3: entangled doors, plus tunneling and power-ups in Level 3
+
+    def _step_level2(self, action):
+        params = self.params
+        if action != NOOP and self.tick >= self.blink_unlock:
+            if self.blinking:
+                self._teleport()
+                action = NOOP  # The collapsing key press is not a move
+            elif self.keys_enabled:
+                if action == TOGGLE_DOOR:
+                    self._toggle_door()
+                elif action in TUNNELS and self.level == 3:
+                    self._attempt_tunneling(*TUNNELS[action])
+
+        self._check_door_superposition()
+        if self.tick - self.last_teleport >= self.ticks(params["teleport_interval"]) and not self.blinking:
+            self.blinking = True
+            self.keys_enabled = False
+            self.blink_unlock = self.tick + self.ticks(params["blink_lock"])
+
+        if self.keys_enabled and action in MOVES:
+            self._walk_through_doors(*MOVES[action])
+
+    _step_level3 = _step_level2
+
+    def _walk_through_doors(self, dx, dy):
+        x, y = self.player[0] + dx, self.player[1] + dy
+        if not (0 <= x < self.grid_size and 0 <= y < self.grid_size):
+            return
+        cell = self.rows[y][x]
+        if cell == DOOR:
+            if self.door_states.get((x, y)) is True:
+                self.player = (x, y)
+        elif cell in (PATH, EXIT) or (cell == POWERUP and self.level == 3):
+            if cell == POWERUP:
+                self.tunneling_probability = min(100, self.tunneling_probability + self.params["power_up_bonus"])
+                self.rows[y][x] = PATH
+                self.maze[y, x] = PATH
+                self.open_cells.cell_changed((x, y), PATH)
+            self.player = (x, y)
+        if cell == EXIT:
+            self._finish("exit")
+
+    def _adjacent_door(self):
+        px, py = self.player
+        for dx, dy in ((-1, 0), (1, 0), (0, -1), (0, 1)):
+            x, y = px + dx, py + dy
+            if 0 <= x < self.grid_size and 0 <= y < self.grid_size and self.rows[y][x] == DOOR:
+                return (x, y)
+        return None
+
+    def _has_red_neighbor(self, door):
+        x, y = door
+        for dx, dy in ((-1, 0), (1, 0), (0, -1), (0, 1)):
+            nx, ny = x + dx, y + dy
+            if 0 <= nx < self.grid_size and 0 <= ny < self.grid_size:
+                if self.rows[ny][nx] == DOOR and self.door_states.get((nx, ny)) is False:
+                    return True
+        return False
+
+    def _toggle_door(self):
+        """Measure the entangled pair of the door next to the player"""
+        door = self._adjacent_door()
+        if door is None:
+            return
+        for pair in self.entangled_pairs:
+            if door in pair:
+                if any(self.door_states.get(d) is None for d in pair):
+                    if self._has_red_neighbor(pair[0]) or self._has_red_neighbor(pair[1]):
+                        self.door_states[pair[0]] = True
+                        self.door_states[pair[1]] = True
+                    else:
+                        state = self.rng.choice((True, False))
+                        self.door_states[pair[0]] = state
+                        self.door_states[pair[1]] = not state
+                    self.door_pair_timers[pair] = self.tick
+                break
+
+    def _check_door_superposition(self):
+        """Return measured pairs to superposition once their time is up"""
+        if not self.door_pair_timers:
+            return
+        duration = self.ticks(self.params["superposition_duration"])
+        expired = [pair for pair, measured in self.door_pair_timers.items() if self.tick - measured >= duration]
+        for pair in expired:
+            self.door_states[pair[0]] = None
+            self.door_states[pair[1]] = None
+            del self.door_pair_timers[pair]
+
+    def _tunnel_ready(self):
+        return self.last_tunnel is None or self.tick - self.last_tunnel >= self.ticks(self.params["tunnel_cooldown"])
+
+    def _attempt_tunneling(self, dx, dy):
+        if not self._tunnel_ready():
+            return
+        self.last_tunnel = self.tick
+        if self.rng.randint(1, 100) <= self.tunneling_probability:
+            x, y = self.player[0] + dx, self.player[1] + dy
+            if 0 <= x < self.grid_size and 0 <= y < self.grid_size:
+                self.player = (x, y)
+
+    # Level 4: a hunter that searches for the player, tunnels and teleports closer
+
+    def _step_level4(self, action):
+        if action in MOVES:
+            self._walk(*MOVES[action])
+            if self.done:
+                return
+        self._move_enemy()
+
+    def _move_enemy(self):
+        params = self.params
+        self.teleport_timer += 1
+        if self.teleport_timer >= self.ticks(params["enemy_teleport_interval"]):
+            self.teleport_timer = 0
+            self.blinking = True
+            self.blink_timer = 0
+            self.enemy_blink_state = False
+
+        if self.blinking:
+            self.blink_timer += 1
+            if self.blink_timer % params["enemy_blink_ticks"] == 0:
+                self.enemy_blink_state = not self.enemy_blink_state
+            if self.blink_timer >= self.ticks(params["enemy_blink_duration"]):
+                self.blinking = False
+                self._teleport_enemy()
+
+        self.enemy_move_counter += 1
+        if self.enemy_tunnel_cooldown > 0:
+            self.enemy_tunnel_cooldown -= 1
+        if self.enemy_move_counter < params["enemy_move_ticks"]:
+            return
+        self.enemy_move_counter = 0
+        if self.blinking:
+            return  # No walking while the teleport is in progress
+
+        if self.rng.random() < params["enemy_tunnel_chance"] and self.enemy_tunnel_cooldown == 0:
+            self.enemy_tunneling = True
+            self.enemy_tunnel_cooldown = params["enemy_tunnel_cooldown"]
+        else:
+            self.enemy_tunneling = False
+
+        if self.enemy_tunneling:
+            self.enemy = self._tunnel_step()
+        else:
+            self.enemy = self._hunt_step()
+        if self.enemy == self.player:
+            self._finish("caught")
+
+    def _teleport_enemy(self):
+        """Jump to a random path cell closer to the player than the enemy is"""
+        (ex, ey), (px, py) = self.enemy, self.player
+        current = np.hypot(ex - px, ey - py)
+        cells = self.maze.cells_of(PATH, EXIT)
+        closer = cells[np.hypot(cells[:, 0] - px, cells[:, 1] - py) < current].tolist()
+        if closer:
+            self.enemy = tuple(self.rng.choice(closer))
+
+    def _tunnel_step(self):
+        """One step straight at the player along the dominant axis, walls or not"""
+        (ex, ey), (px, py) = self.enemy, self.player
+        dx, dy = px - ex, py - ey
+        step_x = 0 if dx == 0 else (1 if dx > 0 else -1)
+        step_y = 0 if dy == 0 else (1 if dy > 0 else -1)
+        if abs(dx) > abs(dy):
+            step_y = 0
+        else:
+            step_x = 0
+        last = self.grid_size - 1
+        return max(0, min(last, ex + step_x)), max(0, min(last, ey + step_y))
+
+    def _hunt_step(self):
+        """First step of the enemy's breadth-first search for the player, as in the game"""
+        start, target = self.enemy, self.player
+        queue = deque([start])
+        visited = set()
+        parent = {}
+        neighbours = self.neighbours
+        while queue:
+            cell = queue.popleft()
+            if cell in visited:
+                continue
+            visited.add(cell)
+            if cell == target:
+                while cell in parent and parent[cell] != start:
+                    cell = parent[cell]
+                return cell
+            for neighbour in neighbours[cell]:
+                if neighbour not in visited:
+                    queue.append(neighbour)
+                    parent[neighbour] = cell
+        return start
+
+    # Level 5: every key press collapses the maze into its next configuration
+
+    def _step_level5(self, action):
+        direction = MOVES.get(action)
+        if direction is not None and action != self.last_action:
+            # A new key press measures the maze: swap in the next one
+            self.direction = direction
+            self.blinking = False
+            self.maze_count += 1
+            self._set_maze(self._build_maze(self.maze_count))
+        elif direction is None and self.last_action in MOVES:
+            # Letting go puts the walls back into superposition
+            self.direction = None
+            self.blinking = True
+        self.last_action = action
+
+        if self.direction and not self.blinking:
+            self._walk(*self.direction)
@@ -0,0 +1,57 @@
+# maze_benchmark.py - Times every maze algorithm on small and very large grids
+# Usage: python maze_benchmark.py [algorithm ...]
+import random
+import sys
+import time
+
+from maze_grid import PATH
+from maze_generators import GENERATORS
+
+GRID_SIZES = [21, 201, 1001, 2001]
+REPEATS = 3
+TARGET_SECONDS = 1.0  # The backtracker must build 2001x2001 well under this
+
+def time_generator(generator, grid_size, repeats=REPEATS):
+    """Return the best wall-clock time of several runs and the last maze"""
+    best = float("inf")
+    maze = None
+    for seed in range(repeats):
+        rng = random.Random(seed)
+        start = time.perf_counter()
+        maze = generator(grid_size, rng)
+        best = min(best, time.perf_counter() - start)
+    return best, maze
+
+def dead_end_ratio(maze):
+    """Share of path cells with exactly one open neighbour"""
+    paths = maze.cells == PATH
+    dead_ends = paths & (maze.neighbour_wall_counts() == 3)
+    return dead_ends.sum() / max(paths.sum(), 1)
+
+def main(algorithms):
+    """Print generation time, throughput and corridor shape per algorithm"""
+    print(f"{'algorithm':>12} {'size':>6} {'seconds':>9} {'cells/sec':>12} {'dead ends':>10}")
+    backtracker_time = None
+    for name in algorithms:
+        for grid_size in GRID_SIZES:
+            best, maze = time_generator(GENERATORS[name], grid_size)
+            print(f"{name:>12} {grid_size:>6} {best:>9.4f} {grid_size * grid_size / best:>12,.0f} "
+                  f"{dead_end_ratio(maze):>9.1%}")
+            if name == "backtracker" and grid_size == GRID_SIZES[-1]:
+                backtracker_time = best
+
+    if backtracker_time is None:
+        return 0
+    size = GRID_SIZES[-1]
+    if backtracker_time >= TARGET_SECONDS:
+        print(f"FAIL: backtracker {size}x{size} took {backtracker_time:.3f}s (target < {TARGET_SECONDS}s)")
+        return 1
+    print(f"OK: backtracker {size}x{size} built in {backtracker_time:.3f}s")
+    return 0
+
+if __name__ == "__main__":
+    unknown = [name for name in sys.argv[1:] if name not in GENERATORS]
+    if unknown:
+        print(f"Unknown algorithm(s): {', '.join(unknown)}. Choose from: {', '.join(GENERATORS)}")
+        sys.exit(2)
+    sys.exit(main(sys.argv[1:] or list(GENERATORS)))
@@ -0,0 +1,34 @@
+# maze_buffer.py - Front/back maze pair with the next maze built off the main thread
+from concurrent.futures import ThreadPoolExecutor
+
+class MazeDoubleBuffer:
+    """Keeps the maze in play (front) plus the next one (back) already built.
+
+    A single worker thread refills the back buffer right after every swap,
+    so swap() normally just exchanges references instead of generating a
+    maze in the middle of event handling.
+    """
+    def __init__(self, build):
+        self.build = build  # Called with no arguments, returns a MazeGrid
+        self.worker = ThreadPoolExecutor(max_workers=1)
+        self.front = build()
+        self.back = self.worker.submit(build)
+
+    def swap(self):
+        """Make the back maze current and start building the next one.
+
+        Returns the new front maze and the (x, y) cells that changed.
+        """
+        try:
+            maze = self.back.result()  # Only blocks if swapped faster than one build
+        except Exception as e:
+            print(f"Error building next maze: {e}")
+            maze = self.build()
+        changed = self.front.changed_cells(maze)
+        self.front = maze
+        self.back = self.worker.submit(self.build)
+        return maze, changed
+
+    def close(self):
+        """Stop the worker without waiting for the pending build"""
+        self.worker.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,148 @@
+# maze_cache.py - Seeded maze generation with an on-disk cache in the game database
+import datetime
+import hashlib
+import os
+import random
+import sqlite3
+import threading
+
+from maze_generators import build_maze
+from maze_packed import pack_maze, unpack_maze
+
+db_file = "quantum_maze_data.db"
+
+# Bump when a generator changes so old (algorithm, size, seed) entries are not reused
+CACHE_VERSION = 2
+MAX_CACHED_MAZES = 5000
+
+# Set to an integer or "daily" to make every level reproducible, e.g.
+#   QUANTUM_MAZE_SEED=daily python GAME.py
+# The levels are separate processes and inherit it from the launcher.
+SEED_ENV = "QUANTUM_MAZE_SEED"
+
+def daily_seed(day=None):
+    """Seed shared by every player on the same calendar day, e.g. 20261017"""
+    day = day or datetime.date.today()
+    return int(day.strftime("%Y%m%d"))
+
+def session_seed():
+    """Seed requested through the environment, or None for random mazes"""
+    value = os.environ.get(SEED_ENV, "").strip()
+    if not value:
+        return None
+    if value.lower() == "daily":
+        return daily_seed()
+    try:
+        return int(value)
+    except ValueError:
+        print(f"Ignoring invalid {SEED_ENV} value: {value!r}")
+        return None
+
+def derive_seed(seed, level, index=0):
+    """Seed for the index-th maze of a level in a session seeded with seed"""
+    digest = hashlib.sha256(f"{seed}:{level}:{index}".encode()).digest()
+    return int.from_bytes(digest[:8], "big")
+
+def level_seed(level, index=0):
+    """Seed for the index-th maze of a level, or None when no session seed is set"""
+    seed = session_seed()
+    if seed is None:
+        return None
+    return derive_seed(seed, level, index)
+
+def seeded_rng(seed):
+    """Private RNG for a seed, or the global random module when seed is None"""
+    return random.Random(seed) if seed is not None else random
+
+def cache_key(grid_size, algorithm, seed):
+    """Hash addressing the maze produced by (algorithm, grid size, seed)"""
+    return hashlib.sha256(f"{algorithm}:{grid_size}:{seed}:v{CACHE_VERSION}".encode()).hexdigest()
+
+class MazeCache:
+    """Stores generated mazes as packed blobs (see maze_packed) in the game database"""
+    def __init__(self, path=db_file):
+        self.path = path
+        self.conn = None
+
+    def connect(self):
+        """Open the database once per process and create the table if needed"""
+        if self.conn is None:
+            self.conn = sqlite3.connect(self.path)
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS maze_cache (
+                    key TEXT PRIMARY KEY,
+                    algorithm TEXT,
+                    grid_size INTEGER,
+                    seed TEXT,
+                    data BLOB,
+                    created TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+            self.conn.commit()
+        return self.conn
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+    def get(self, grid_size, algorithm, seed):
+        """Return the cached maze or None"""
+        row = self.connect().execute(
+            "SELECT data FROM maze_cache WHERE key = ?",
+            (cache_key(grid_size, algorithm, seed),)
+        ).fetchone()
+        if row is None:
+            return None
+        maze = unpack_maze(row[0])
+        return maze if maze.grid_size == grid_size else None
+
+    def put(self, grid_size, algorithm, seed, maze):
+        """Store a maze, dropping the oldest entries past MAX_CACHED_MAZES"""
+        conn = self.connect()
+        conn.execute(
+            "INSERT OR REPLACE INTO maze_cache (key, algorithm, grid_size, seed, data) VALUES (?, ?, ?, ?, ?)",
+            (cache_key(grid_size, algorithm, seed), algorithm, grid_size, str(seed),
+             pack_maze(maze))
+        )
+        conn.execute("""
+            DELETE FROM maze_cache WHERE rowid NOT IN (
+                SELECT rowid FROM maze_cache ORDER BY created DESC, rowid DESC LIMIT ?
+            )
+        """, (MAX_CACHED_MAZES,))
+        conn.commit()
+
+    def load_or_generate(self, grid_size, algorithm, seed):
+        """Return the maze for (algorithm, size, seed), generating it only once"""
+        try:
+            maze = self.get(grid_size, algorithm, seed)
+            if maze is not None:
+                return maze
+        except (sqlite3.Error, ValueError) as e:
+            print(f"Error reading maze cache: {e}")
+
+        maze = build_maze(grid_size, algorithm, random.Random(seed))
+        try:
+            self.put(grid_size, algorithm, seed, maze)
+        except sqlite3.Error as e:
+            print(f"Error writing maze cache: {e}")
+        return maze
+
+_local = threading.local()
+
+def get_cache():
+    """Cache on the game database for the calling thread.
+
+    SQLite connections cannot cross threads, and mazes are also built off
+    the main thread (Level 5 fills its back buffer on a worker).
+    """
+    cache = getattr(_local, "cache", None)
+    if cache is None:
+        cache = _local.cache = MazeCache()
+    return cache
+
+def seeded_maze(grid_size, algorithm="backtracker", seed=None):
+    """Generate a maze; with a seed the result is reproducible and cached on disk"""
+    if seed is None:
+        return build_maze(grid_size, algorithm)
+    return get_cache().load_or_generate(grid_size, algorithm, seed)
@@ -0,0 +1,337 @@
+import itertools
+import random
+from array import array
+
+import numpy as np
+
+from maze_grid import MazeGrid, PATH, EXIT
+
+# Maze cells sit on even coordinates and the walls between them on odd ones,
+# exactly like the original per-level generators. Every registered generator
+# takes (grid_size, rng) and returns a MazeGrid with the start and exit set;
+# build_maze checks that grid_size is odd, so the generators themselves don't.
+GENERATORS = {}
+
+def register_generator(name):
+    """Decorator that adds a generator function to the registry"""
+    def decorator(generator):
+        GENERATORS[name] = generator
+        return generator
+    return decorator
+
+def get_generator(name):
+    """Look up a registered generator by name"""
+    try:
+        return GENERATORS[name]
+    except KeyError:
+        raise ValueError(f"Unknown maze algorithm '{name}', choose one of: {', '.join(GENERATORS)}") from None
+
+def build_maze(grid_size, algorithm="backtracker", rng=random):
+    """Generate a maze with any registered algorithm"""
+    if grid_size < 1 or grid_size % 2 == 0:
+        # Cells sit on even coordinates, so an even size leaves the last row and column cut off
+        raise ValueError(f"Maze grid size must be odd and at least 1, got {grid_size}")
+    return get_generator(algorithm)(grid_size, rng)
+
+def _bulk_rng(rng):
+    """NumPy generator seeded from rng, so a seeded rng still gives the same maze"""
+    return np.random.default_rng(rng.getrandbits(64))
+
+def _random_indices(rng, count, limit):
+    """Return count random values in range(limit) as bytes (limit <= 256)"""
+    return _bulk_rng(rng).integers(0, limit, count, dtype=np.uint8).tobytes()
+
+def _random_stream(rng, limit, chunk=65536):
+    """Endless iterator of random values in range(limit), drawn in bulk"""
+    bulk = _bulk_rng(rng)
+    while True:
+        yield from bulk.integers(0, limit, chunk, dtype=np.uint8).tobytes()
+
+def _bordered_cells(n):
+    """Flat state array for an n x n cell lattice with a sentinel border.
+
+    Returns (state, width): inner cells are 0, border cells 2, and width is
+    the row stride, so the neighbours of a cell are +-1 and +-width.
+    """
+    width = n + 2
+    state = bytearray(width * width)
+    state[:width] = b"\x02" * width
+    state[-width:] = b"\x02" * width
+    state[::width] = b"\x02" * width
+    state[width - 1::width] = b"\x02" * width
+    return state, width
+
+def _finish(maze):
+    """Set start and exit points"""
+    maze[0, 0] = PATH
+    maze[maze.grid_size - 1, maze.grid_size - 1] = EXIT
+    return maze
+
+def _maze_from_parents(grid_size, parent, root):
+    """Carve a spanning tree given as parent links on a bordered cell lattice"""
+    n = (grid_size + 1) // 2
+    width = n + 2
+    maze = MazeGrid(grid_size)
+    maze[::2, ::2] = PATH
+    parents = np.frombuffer(parent, dtype=np.int32).reshape(width, width)[1:-1, 1:-1]
+    cell_y, cell_x = np.indices((n, n))
+    parent_y, parent_x = np.divmod(parents, width)
+    carved = parents != 0
+    carved[(root // width) - 1, (root % width) - 1] = False
+    maze[cell_y[carved] + parent_y[carved] - 1, cell_x[carved] + parent_x[carved] - 1] = PATH
+    return _finish(maze)
+
+def _maze_from_passages(grid_size, east, south):
+    """Carve a maze from boolean passage arrays.
+
+    east[y, x] opens the wall between cells (x, y) and (x + 1, y), south[y, x]
+    the wall between cells (x, y) and (x, y + 1).
+    """
+    maze = MazeGrid(grid_size)
+    maze[::2, ::2] = PATH
+    maze[::2, 1::2][east] = PATH
+    maze[1::2, ::2][south] = PATH
+    return _finish(maze)
+
+@register_generator("backtracker")
+def generate_backtracker(grid_size, rng=random):
+    """Generate a maze with the recursive backtracker (depth-first search).
+
+    Visited marks live in a flat bytearray with a sentinel border (no bounds
+    checks), the direction order of every step comes from a table of the 24
+    precomputed permutations indexed by one bulk-drawn random byte, and the
+    passages are carved afterwards in one vectorized pass from the parent
+    links. Long winding corridors with few dead ends.
+    """
+    n = (grid_size + 1) // 2  # Cells per row
+    visited, width = _bordered_cells(n)
+
+    directions = (1, -1, width, -width)
+    permutations = list(itertools.permutations(directions))
+
+    parent = array("i", bytes(4 * width * width))
+    start = (rng.randrange(n) + 1) * width + rng.randrange(n) + 1
+    visited[start] = 1
+    stack = [start]
+    push = stack.append
+    pop = stack.pop
+    cell = start
+
+    # Every step either pushes or pops a cell, so 2 * n * n steps are enough
+    for index in _random_indices(rng, 2 * n * n, len(permutations)):
+        first, second, third, fourth = permutations[index]
+        if not visited[cell + first]:
+            neighbour = cell + first
+        elif not visited[cell + second]:
+            neighbour = cell + second
+        elif not visited[cell + third]:
+            neighbour = cell + third
+        elif not visited[cell + fourth]:
+            neighbour = cell + fourth
+        else:
+            # Dead end, backtrack
+            pop()
+            if not stack:
+                break
+            cell = stack[-1]
+            continue
+        visited[neighbour] = 1
+        parent[neighbour] = cell
+        push(neighbour)
+        cell = neighbour
+
+    return _maze_from_parents(grid_size, parent, start)
+
+@register_generator("kruskal")
+def generate_kruskal(grid_size, rng=random):
+    """Generate a maze with randomized Kruskal's algorithm.
+
+    Walls are removed in shuffled order whenever they separate two different
+    sets; the sets are an array-based union-find with path halving. Many
+    short dead ends.
+    """
+    n = (grid_size + 1) // 2
+    east_count = n * (n - 1)
+
+    # Wall k < east_count is east of cell k + k // (n - 1), the rest are south of cell k - east_count
+    walls = np.arange(2 * east_count)
+    first = np.where(walls < east_count, walls + walls // max(n - 1, 1), walls - east_count)
+    second = np.where(walls < east_count, first + 1, first + n)
+    order = _bulk_rng(rng).permutation(2 * east_count)
+
+    parent = list(range(n * n))
+    opened = np.zeros(2 * east_count, dtype=bool)
+    remaining = n * n - 1
+    for wall, a, b in zip(order.tolist(), first[order].tolist(), second[order].tolist()):
+        if not remaining:
+            break
+        while parent[a] != a:
+            parent[a] = parent[parent[a]]
+            a = parent[a]
+        while parent[b] != b:
+            parent[b] = parent[parent[b]]
+            b = parent[b]
+        if a != b:
+            parent[a] = b
+            opened[wall] = True
+            remaining -= 1
+
+    east = opened[:east_count].reshape(n, n - 1)
+    south = opened[east_count:].reshape(n - 1, n)
+    return _maze_from_passages(grid_size, east, south)
+
+@register_generator("prim")
+def generate_prim(grid_size, rng=random):
+    """Generate a maze with randomized Prim's algorithm.
+
+    Grows the maze from a frontier list with O(1) swap-remove; each frontier
+    cell joins a random neighbour already in the maze. Short branchy
+    corridors radiating from the start.
+    """
+    n = (grid_size + 1) // 2
+    state, width = _bordered_cells(n)  # 0 = unvisited, 1 = in maze, 2 = border, 3 = frontier
+    directions = (1, -1, width, -width)
+    parent = array("i", bytes(4 * width * width))
+    choices = iter(_bulk_rng(rng).random(2 * n * n).tolist())
+
+    start = (rng.randrange(n) + 1) * width + rng.randrange(n) + 1
+    state[start] = 1
+    frontier = []
+    for step in directions:
+        if not state[start + step]:
+            state[start + step] = 3
+            frontier.append(start + step)
+
+    while frontier:
+        index = int(next(choices) * len(frontier))
+        cell = frontier[index]
+        frontier[index] = frontier[-1]
+        frontier.pop()
+
+        in_maze = [cell + step for step in directions if state[cell + step] == 1]
+        parent[cell] = in_maze[int(next(choices) * len(in_maze))]
+        state[cell] = 1
+        for step in directions:
+            if not state[cell + step]:
+                state[cell + step] = 3
+                frontier.append(cell + step)
+
+    return _maze_from_parents(grid_size, parent, start)
+
+@register_generator("wilson")
+def generate_wilson(grid_size, rng=random):
+    """Generate a maze with Wilson's algorithm (loop-erased random walks).
+
+    Produces a uniform spanning tree with no directional bias, but the first
+    walks are long so it is the slowest generator on big grids.
+    """
+    n = (grid_size + 1) // 2
+    state, width = _bordered_cells(n)  # 0 = not in tree, 1 = in tree, 2 = border
+    directions = (1, -1, width, -width)
+    parent = array("i", bytes(4 * width * width))
+    walk = array("i", bytes(4 * width * width))  # Latest exit of each cell on the current walk
+    steps = _random_stream(rng, 4)
+
+    cells = [(y + 1) * width + x + 1 for y in range(n) for x in range(n)]
+    root = cells[rng.randrange(len(cells))]
+    state[root] = 1
+    for start in cells:
+        if state[start]:
+            continue
+        # Random walk until the tree is hit; overwriting exits erases loops
+        cell = start
+        while state[cell] != 1:
+            neighbour = cell + directions[next(steps)]
+            if state[neighbour] == 2:
+                continue
+            walk[cell] = neighbour
+            cell = neighbour
+        # Add the loop-erased path to the tree
+        cell = start
+        while state[cell] != 1:
+            state[cell] = 1
+            parent[cell] = walk[cell]
+            cell = walk[cell]
+
+    return _maze_from_parents(grid_size, parent, root)
+
+def eller_rows(width, rng=random, height=None):
+    """Yield (east, south) passage lists for each row of an Eller's maze.
+
+    east has width - 1 entries and south has width entries. Only the sets of
+    the current row are kept, so with height=None rows stream forever;
+    otherwise the last row joins every remaining set and its south is None.
+    """
+    coins = _random_stream(rng, 2)
+    labels = list(range(width))
+    parent = []
+
+    def find(x):
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    row = 0
+    while height is None or row < height:
+        last = height is not None and row == height - 1
+
+        # Union-find over the row's positions, seeded by the sets carried down
+        first = {}
+        parent = [first.setdefault(label, x) for x, label in enumerate(labels)]
+
+        # Randomly join neighbouring cells from different sets
+        east = [False] * (width - 1)
+        for x in range(width - 1):
+            a, b = find(x), find(x + 1)
+            if a != b and (last or next(coins)):
+                east[x] = True
+                parent[b] = a
+        if last:
+            yield east, None
+            return
+
+        # Every set must continue down at least once
+        roots = [find(x) for x in range(width)]
+        south = [bool(next(coins)) for _ in range(width)]
+        members = {}
+        for x, root in enumerate(roots):
+            members.setdefault(root, []).append(x)
+        for group in members.values():
+            if not any(south[x] for x in group):
+                south[group[rng.randrange(len(group))]] = True
+
+        yield east, south
+
+        # Cells continued from above keep their set, the rest start new ones
+        labels = [roots[x] if south[x] else width + x for x in range(width)]
+        row += 1
+
+@register_generator("eller")
+def generate_eller(grid_size, rng=random):
+    """Generate a maze with Eller's algorithm, one row at a time.
+
+    Memory use is a single row of sets, which is what makes the endless
+    streaming mode possible. Mostly horizontal runs with regular drops.
+    """
+    n = (grid_size + 1) // 2
+    rows = list(eller_rows(n, rng, height=n))
+    east = np.array([east for east, _ in rows], dtype=bool).reshape(n, n - 1)
+    south = np.array([south for _, south in rows[:-1]], dtype=bool).reshape(n - 1, n)
+    return _maze_from_passages(grid_size, east, south)
+
+@register_generator("binary_tree")
+def generate_binary_tree(grid_size, rng=random):
+    """Generate a maze with the binary tree algorithm.
+
+    Every cell opens either north or west, so the whole maze is one
+    vectorized coin flip. By far the fastest, but it leaves long straight
+    corridors along the top row and left column.
+    """
+    n = (grid_size + 1) // 2
+    north = _bulk_rng(rng).integers(0, 2, (n, n)).astype(bool)
+    north[0, :] = False  # Top row can only open west
+    north[:, 0] = True  # Left column can only open north
+    west = ~north
+    west[0, 0] = False
+    return _maze_from_passages(grid_size, west[:, 1:], north[1:, :])
@@ -0,0 +1,145 @@
+import random
+
+import numpy as np
+
+# Cell types shared by every level
+WALL = 0
+PATH = 1
+DOOR = 2
+EXIT = 3
+POWERUP = 4
+
+# Cells the player can always step on
+WALKABLE = frozenset((PATH, EXIT))
+
+class MazeGrid:
+    """Square maze stored as a contiguous uint8 NumPy array indexed [y, x]"""
+    def __init__(self, grid_size, cells=None):
+        self.grid_size = grid_size
+        if cells is None:
+            cells = np.zeros((grid_size, grid_size), dtype=np.uint8)
+        self.cells = np.ascontiguousarray(cells, dtype=np.uint8)
+
+    @classmethod
+    def from_rows(cls, rows):
+        """Build a grid from the old list-of-lists representation"""
+        return cls(len(rows), np.array(rows, dtype=np.uint8))
+
+    def __getitem__(self, index):
+        return self.cells[index]
+
+    def __setitem__(self, index, value):
+        self.cells[index] = value
+
+    def __eq__(self, other):
+        if not isinstance(other, MazeGrid):
+            return NotImplemented
+        return self.grid_size == other.grid_size and np.array_equal(self.cells, other.cells)
+
+    def copy(self):
+        """Return an independent copy of the grid"""
+        return MazeGrid(self.grid_size, self.cells.copy())
+
+    def tolist(self):
+        """Return the grid as a list of row lists"""
+        return self.cells.tolist()
+
+    def in_bounds(self, x, y):
+        return 0 <= x < self.grid_size and 0 <= y < self.grid_size
+
+    def is_walkable(self, x, y, walkable=WALKABLE):
+        """Check if (x, y) is inside the grid and one of the walkable cell types"""
+        return self.in_bounds(x, y) and self.cells.item(y, x) in walkable
+
+    def cells_of(self, *kinds):
+        """Return an (N, 2) array of (x, y) positions whose cell type is in kinds"""
+        if len(kinds) == 1:
+            mask = self.cells == kinds[0]
+        else:
+            mask = np.isin(self.cells, kinds)
+        return np.argwhere(mask)[:, ::-1]
+
+    def open_cells(self):
+        """All plain path cells"""
+        return self.cells_of(PATH)
+
+    def doors(self):
+        """All door cells"""
+        return self.cells_of(DOOR)
+
+    def random_cell_of(self, *kinds, rng=random):
+        """Pick a random (x, y) of the given cell types, or None if there are none"""
+        positions = self.cells_of(*kinds)
+        if len(positions) == 0:
+            return None
+        x, y = positions[rng.randrange(len(positions))]
+        return int(x), int(y)
+
+    def changed_cells(self, other):
+        """Return an (N, 2) array of (x, y) positions where other differs from this grid"""
+        return np.argwhere(self.cells != other.cells)[:, ::-1]
+
+    def neighbour_wall_counts(self):
+        """Number of wall cells among the 4 neighbours of every cell.
+
+        Cells outside the grid count as walls.
+        """
+        walls = np.pad(self.cells == WALL, 1, constant_values=True).astype(np.uint8)
+        return walls[:-2, 1:-1] + walls[2:, 1:-1] + walls[1:-1, :-2] + walls[1:-1, 2:]
+
+class OpenCellIndex:
+    """Positions of the cells of some kinds, with O(1) updates and random choice.
+
+    Positions live in a list for uniform sampling plus a dict of their list
+    slots, so removing one swaps the last entry into its place.
+    """
+    def __init__(self, kinds=(PATH,), positions=()):
+        self.kinds = frozenset(kinds)
+        self.positions = []
+        self.slots = {}  # (x, y) -> index into positions
+        for position in positions:
+            self.add(position)
+
+    @classmethod
+    def of(cls, maze, *kinds, margin=0):
+        """Index every cell of the given kinds (PATH by default) at least margin cells from the edge"""
+        kinds = kinds or (PATH,)
+        positions = maze.cells_of(*kinds)
+        if margin:
+            inner = maze.grid_size - margin
+            keep = (positions >= margin).all(axis=1) & (positions < inner).all(axis=1)
+            positions = positions[keep]
+        return cls(kinds, map(tuple, positions.tolist()))
+
+    def __len__(self):
+        return len(self.positions)
+
+    def __contains__(self, position):
+        return position in self.slots
+
+    def add(self, position):
+        if position not in self.slots:
+            self.slots[position] = len(self.positions)
+            self.positions.append(position)
+
+    def discard(self, position):
+        slot = self.slots.pop(position, None)
+        if slot is None:
+            return
+        last = self.positions.pop()
+        if slot < len(self.positions):
+            self.positions[slot] = last
+            self.slots[last] = slot
+
+    def cell_changed(self, position, kind):
+        """Keep the index in step after the cell at position became kind"""
+        if kind in self.kinds:
+            self.add(position)
+        else:
+            self.discard(position)
+
+    def choice(self, rng=random):
+        """Uniformly random indexed (x, y), or None if the index is empty"""
+        if not self.positions:
+            return None
+        return self.positions[rng.randrange(len(self.positions))]
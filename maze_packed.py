@@ -0,0 +1,108 @@
+# maze_packed.py - Compact maze format: one bit per cell plus a sparse feature table
+import mmap
+import struct
+
+import numpy as np
+
+from maze_grid import MazeGrid, WALL, PATH, WALKABLE
+
+MAGIC = b"QMZP"
+FORMAT_VERSION = 1
+
+# magic, format version, grid size, number of features
+HEADER = struct.Struct("<4sHII")
+
+# Doors, exits and power-ups are rare, so they are listed instead of stored per cell
+FEATURE_DTYPE = np.dtype([("x", "<u4"), ("y", "<u4"), ("kind", "u1")])
+
+class PackedMaze:
+    """Maze stored as an open-cell bitset plus a table of special cells.
+
+    Bit y * grid_size + x is set for every cell that is not a wall; cells
+    listed in the feature table override the plain PATH type. A 2001x2001
+    maze takes about 500 KB this way instead of 4 MB.
+    """
+    def __init__(self, grid_size, bits, features=None):
+        self.grid_size = grid_size
+        self.bits = bits  # uint8 array, big-endian bit order as produced by np.packbits
+        self.features = features or {}  # (x, y) -> cell type
+
+    @classmethod
+    def from_grid(cls, maze):
+        """Pack a MazeGrid"""
+        cells = maze.cells
+        bits = np.packbits(cells.ravel() != WALL)
+        ys, xs = np.nonzero((cells != WALL) & (cells != PATH))
+        features = {(x, y): cells.item(y, x) for x, y in zip(xs.tolist(), ys.tolist())}
+        return cls(maze.grid_size, bits, features)
+
+    def to_grid(self):
+        """Unpack into a MazeGrid"""
+        n = self.grid_size
+        open_cells = np.unpackbits(self.bits, count=n * n).reshape(n, n)
+        maze = MazeGrid(n, open_cells * np.uint8(PATH))
+        for (x, y), kind in self.features.items():
+            maze[y, x] = kind
+        return maze
+
+    def cell(self, x, y):
+        """Cell type at (x, y) in O(1)"""
+        index = y * self.grid_size + x
+        if not (self.bits.item(index >> 3) >> (7 - (index & 7))) & 1:
+            return WALL
+        return self.features.get((x, y), PATH)
+
+    def is_walkable(self, x, y, walkable=WALKABLE):
+        """Check if (x, y) is inside the grid and one of the walkable cell types"""
+        return 0 <= x < self.grid_size and 0 <= y < self.grid_size and self.cell(x, y) in walkable
+
+    def to_bytes(self):
+        """Serialize as header, bitset, then the feature table"""
+        table = np.array(
+            [(x, y, kind) for (x, y), kind in self.features.items()], dtype=FEATURE_DTYPE
+        )
+        return b"".join((
+            HEADER.pack(MAGIC, FORMAT_VERSION, self.grid_size, len(table)),
+            self.bits.tobytes(),
+            table.tobytes(),
+        ))
+
+    @classmethod
+    def from_bytes(cls, data):
+        """Deserialize from bytes, a memoryview or an mmap.
+
+        The bitset is a view into data rather than a copy, so data must
+        stay alive (and an mmap open) for as long as the maze is used.
+        """
+        if len(data) < HEADER.size:
+            raise ValueError("Packed maze data is truncated")
+        magic, version, grid_size, feature_count = HEADER.unpack_from(data, 0)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError("Not a packed maze (or an unsupported format version)")
+        bit_bytes = (grid_size * grid_size + 7) // 8
+        if len(data) < HEADER.size + bit_bytes + feature_count * FEATURE_DTYPE.itemsize:
+            raise ValueError("Packed maze data is truncated")
+        bits = np.frombuffer(data, dtype=np.uint8, count=bit_bytes, offset=HEADER.size)
+        table = np.frombuffer(data, dtype=FEATURE_DTYPE, count=feature_count,
+                              offset=HEADER.size + bit_bytes)
+        features = {(x, y): kind for x, y, kind in table.tolist()}
+        return cls(grid_size, bits, features)
+
+    def save(self, path):
+        with open(path, "wb") as f:
+            f.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, path):
+        """Map a saved maze into memory instead of reading it"""
+        with open(path, "rb") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return cls.from_bytes(mapped)
+
+def pack_maze(maze):
+    """MazeGrid -> bytes"""
+    return PackedMaze.from_grid(maze).to_bytes()
+
+def unpack_maze(data):
+    """bytes -> MazeGrid"""
+    return PackedMaze.from_bytes(data).to_grid()
@@ -0,0 +1,173 @@
+# maze_pool.py - Mazes built ahead of time by background worker processes
+import json
+import multiprocessing
+import sqlite3
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from maze_cache import db_file, level_seed
+from level_mazes import build_level_maze, DEFAULT_GRID_SIZE, DEFAULT_ALGORITHM
+from maze_packed import pack_maze, unpack_maze
+
+LEVELS = (1, 2, 3, 4, 5)
+MAZES_PER_LEVEL = 2  # Ready mazes kept for every level type
+POOL_WORKERS = 2
+
+def _connect(path):
+    """Open the game database in autocommit mode and create the pool table"""
+    conn = sqlite3.connect(path, timeout=5, isolation_level=None)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS maze_pool (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            level INTEGER,
+            grid_size INTEGER,
+            algorithm TEXT,
+            data BLOB,
+            pairs TEXT,
+            created TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    return conn
+
+def encode_level_maze(result):
+    """Level maze -> (packed maze bytes, entangled pairs as JSON or None)"""
+    if isinstance(result, tuple):
+        maze, _, entangled_pairs, _ = result
+        return pack_maze(maze), json.dumps(entangled_pairs)
+    return pack_maze(result), None
+
+def decode_level_maze(data, pairs):
+    """Inverse of encode_level_maze; door levels get fresh door states and timers"""
+    maze = unpack_maze(data)
+    if pairs is None:
+        return maze
+    entangled_pairs = [tuple(map(tuple, pair)) for pair in json.loads(pairs)]
+    door_states = {door: None for pair in entangled_pairs for door in pair}  # Start in superposition
+    return maze, door_states, entangled_pairs, {}
+
+class MazePool:
+    """Keeps MAZES_PER_LEVEL finished mazes per level in the game database.
+
+    The levels run as separate scripts whose top-level code opens a window,
+    so they cannot host spawn-based worker processes themselves. The pool
+    lives in the main menu process instead and hands the results over
+    through the maze_pool table, where take_level_maze picks them up.
+    """
+    def __init__(self, grid_size=DEFAULT_GRID_SIZE, algorithm=DEFAULT_ALGORITHM,
+                 per_level=MAZES_PER_LEVEL, workers=POOL_WORKERS, path=db_file):
+        self.grid_size = grid_size
+        self.algorithm = algorithm
+        self.per_level = per_level
+        self.workers = workers
+        self.path = path
+        self.executor = None
+        self.pending = {level: 0 for level in LEVELS}
+        self.lock = threading.Lock()
+
+    def start(self):
+        """Start the worker processes and queue the missing mazes"""
+        if self.executor is None:
+            self.executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        self.refill()
+
+    def ready_counts(self):
+        """Number of finished mazes waiting in the pool for every level"""
+        conn = _connect(self.path)
+        try:
+            rows = conn.execute(
+                "SELECT level, COUNT(*) FROM maze_pool WHERE grid_size = ? AND algorithm = ? GROUP BY level",
+                (self.grid_size, self.algorithm)
+            ).fetchall()
+        finally:
+            conn.close()
+        counts = {level: 0 for level in LEVELS}
+        counts.update(dict(rows))
+        return counts
+
+    def refill(self):
+        """Queue enough builds to bring every level back to per_level mazes"""
+        if self.executor is None:
+            return
+        try:
+            counts = self.ready_counts()
+        except sqlite3.Error as e:
+            print(f"Error reading maze pool: {e}")
+            return
+
+        for level in LEVELS:
+            with self.lock:
+                missing = self.per_level - counts[level] - self.pending[level]
+            for _ in range(max(missing, 0)):
+                try:
+                    future = self.executor.submit(build_level_maze, level, self.grid_size, self.algorithm)
+                except BrokenProcessPool as e:
+                    # A worker died; levels fall back to building their own mazes
+                    print(f"Maze pool stopped: {e}")
+                    self.shutdown()
+                    return
+                # Counted only once submitted, and before _store can count it off
+                with self.lock:
+                    self.pending[level] += 1
+                future.add_done_callback(lambda f, level=level: self._store(level, f))
+
+    def _store(self, level, future):
+        """Save a finished build (runs on the executor's callback thread)"""
+        with self.lock:
+            self.pending[level] -= 1
+        if future.cancelled():
+            return
+        try:
+            data, pairs = encode_level_maze(future.result())
+            conn = _connect(self.path)
+            try:
+                conn.execute(
+                    "INSERT INTO maze_pool (level, grid_size, algorithm, data, pairs) VALUES (?, ?, ?, ?, ?)",
+                    (level, self.grid_size, self.algorithm, data, pairs)
+                )
+            finally:
+                conn.close()
+        except Exception as e:
+            print(f"Error storing pooled maze for level {level}: {e}")
+
+    def shutdown(self):
+        """Stop the workers without waiting for queued builds"""
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+
+def pop_ready_maze(level, grid_size=DEFAULT_GRID_SIZE, algorithm=DEFAULT_ALGORITHM, path=db_file):
+    """Remove and return the oldest pooled maze for a level, or None if the pool is empty"""
+    conn = _connect(path)
+    try:
+        conn.execute("BEGIN IMMEDIATE")  # Two levels must never get the same maze
+        row = conn.execute(
+            "SELECT id, data, pairs FROM maze_pool WHERE level = ? AND grid_size = ? AND algorithm = ? ORDER BY id LIMIT 1",
+            (level, grid_size, algorithm)
+        ).fetchone()
+        if row is not None:
+            conn.execute("DELETE FROM maze_pool WHERE id = ?", (row[0],))
+        conn.execute("COMMIT")
+    finally:
+        conn.close()
+    return decode_level_maze(row[1], row[2]) if row is not None else None
+
+def take_level_maze(level, grid_size=DEFAULT_GRID_SIZE, algorithm=DEFAULT_ALGORITHM, index=0, max_pairs=None):
+    """Maze for a level start: pooled if one is ready, built on the spot otherwise.
+
+    Seeded sessions skip the pool, since a seeded maze has to be the one the
+    seed names (and comes straight out of the maze cache anyway). So does an
+    explicit max_pairs, because the pool is built with the default door count.
+    """
+    seed = level_seed(level, index)
+    if seed is None and max_pairs is None:
+        try:
+            maze = pop_ready_maze(level, grid_size, algorithm)
+            if maze is not None:
+                return maze
+        except Exception as e:
+            print(f"Error reading maze pool: {e}")
+    return build_level_maze(level, grid_size, algorithm, seed, max_pairs)
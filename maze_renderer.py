@@ -0,0 +1,182 @@
+# maze_renderer.py - Static maze layer baked once, with dirty-rectangle screen updates
+import numpy as np
+import pygame
+
+BLACK = (0, 0, 0)
+MAX_DIRTY_RECTS = 64  # Past this many rectangles one full-window update is cheaper
+
+# Palette slots for blink noise, clear of every cell type
+NOISE_ON = 255
+NOISE_OFF = 254
+
+def cell_palette(colors, background=BLACK):
+    """256-entry palette mapping each cell type (used as the colour index) to its colour"""
+    palette = [background] * 256
+    for kind, color in colors.items():
+        palette[kind] = color
+    return palette
+
+def grid_surface(cells, palette):
+    """One pixel per cell: an 8-bit Surface whose pixels are the colour indices in cells.
+
+    cells is a uint8 array indexed [y, x]; the palette turns the indices into
+    colours, so no per-cell colour lookup happens in Python.
+    """
+    height, width = cells.shape
+    surface = pygame.Surface((width, height), 0, 8)
+    surface.set_palette(palette)
+    pygame.surfarray.blit_array(surface, cells.T)  # surfarray arrays are indexed [x, y]
+    return surface
+
+def scaled_grid_surface(cells, palette, cell_size):
+    """The grid surface blown up to cell_size pixels per cell with one nearest-neighbour scale"""
+    height, width = cells.shape
+    return pygame.transform.scale(grid_surface(cells, palette), (width * cell_size, height * cell_size))
+
+class BlinkNoise:
+    """Random on/off masks for the superposition blink effects.
+
+    Every mask comes out of one vectorized RNG call. With ring_size set, that
+    many masks are drawn up front and cycled, so a blinking frame costs no
+    random numbers at all.
+    """
+    def __init__(self, shape, ring_size=0, rng=None):
+        self.shape = shape
+        self.rng = rng or np.random.default_rng()
+        self.ring = self.rng.random((ring_size, *shape)) < 0.5 if ring_size else None
+        self.position = 0
+
+    def next_mask(self):
+        """Boolean [y, x] array, each cell on with probability 1/2"""
+        if self.ring is None:
+            return self.rng.random(self.shape) < 0.5
+        mask = self.ring[self.position]
+        self.position = (self.position + 1) % len(self.ring)
+        return mask
+
+class MazeRenderer:
+    """Draws a maze from a cached static layer and updates only what changed.
+
+    The cells that stay put during play (paths, the exit, power-ups) are
+    painted once into an off-screen layer. Every frame, begin_frame() erases
+    the previous overlays (player, enemy, doors, text) by copying the layer
+    back over them, the level draws its new overlays through draw_cell() and
+    blit(), and present() passes just those rectangles to display.update.
+    """
+    def __init__(self, screen, maze, cell_size, colors, background=BLACK):
+        self.screen = screen
+        self.maze = maze
+        self.cell_size = cell_size
+        self.colors = dict(colors)  # cell type -> colour baked into the layer
+        self.background = background
+        self.layer = pygame.Surface(screen.get_size(), 0, screen)
+        self.overlays = []  # Rects drawn over the layer since the last begin_frame
+        self.dirty = []  # Rects changed on screen since the last present
+        self.full_redraw = True
+        self.noise = None  # (mask, look, surface) of the last draw_noise
+        self.bake()
+
+    def cell_rect(self, x, y):
+        return pygame.Rect(x * self.cell_size, y * self.cell_size, self.cell_size, self.cell_size)
+
+    def bake(self):
+        """Paint the whole static layer from the maze with one array write and one scale"""
+        self.layer.fill(self.background)
+        self.palette = cell_palette(self.colors, self.background)
+        self.layer.blit(scaled_grid_surface(self.maze.cells, self.palette, self.cell_size), (0, 0))
+        self.noise = None
+        self.invalidate()
+
+    def set_maze(self, maze, changed=None):
+        """Show another maze, repainting only the changed (x, y) cells if they are known"""
+        self.maze = maze
+        if changed is None:
+            self.bake()
+        else:
+            self.repaint_cells(changed)
+
+    def repaint_cells(self, cells):
+        """Refresh the layer where cells changed type, e.g. a collected power-up"""
+        self.noise = None
+        for x, y in cells:
+            rect = self.cell_rect(x, y)
+            self.layer.fill(self.colors.get(self.maze[y, x], self.background), rect)
+            self.screen.blit(self.layer, rect, rect)
+            self.dirty.append(rect)
+
+    def invalidate(self):
+        """Redraw the full window next frame (e.g. after another screen covered it)"""
+        self.full_redraw = True
+
+    def begin_frame(self):
+        """Erase last frame's overlays by restoring the static layer under them"""
+        if self.full_redraw:
+            self.screen.blit(self.layer, (0, 0))
+        else:
+            for rect in self.overlays:
+                self.screen.blit(self.layer, rect, rect)
+            self.dirty.extend(self.overlays)
+        self.overlays = []
+
+    def draw_cell(self, x, y, color):
+        """Fill one grid cell on screen for this frame only"""
+        rect = self.cell_rect(x, y)
+        self.screen.fill(color, rect)
+        self.overlays.append(rect)
+        self.dirty.append(rect)
+
+    def draw_moving_cell(self, previous, current, alpha, color):
+        """Fill a cell that moved from previous to current (x, y), alpha of the way there.
+
+        One-cell steps slide between the two cells; longer jumps (teleports)
+        snap straight to current.
+        """
+        (px, py), (x, y) = previous, current
+        if abs(x - px) + abs(y - py) != 1:
+            px, py = x, y
+        rect = pygame.Rect(round((px + (x - px) * alpha) * self.cell_size),
+                           round((py + (y - py) * alpha) * self.cell_size),
+                           self.cell_size, self.cell_size)
+        self.screen.fill(color, rect)
+        self.overlays.append(rect)
+        self.dirty.append(rect)
+
+    def draw_noise(self, mask, kinds, on_color, off_color=None):
+        """Blink the cells of the given types for this frame only.
+
+        Cells where mask is set take on_color, the others off_color (or their
+        normal colour when off_color is None). The whole maze is rebuilt as
+        colour indices in one array pass and drawn through the palette; the
+        result is kept, so frames drawn with the same mask just blit it again.
+        """
+        key = (kinds, on_color, off_color)
+        if self.noise is None or self.noise[0] is not mask or self.noise[1] != key:
+            cells = self.maze.cells
+            indices = cells.copy()
+            blinking = np.isin(cells, kinds)
+            if off_color is not None:
+                indices[blinking] = NOISE_OFF
+            indices[blinking & mask] = NOISE_ON
+            palette = list(self.palette)
+            palette[NOISE_ON] = on_color
+            palette[NOISE_OFF] = off_color or self.background
+            self.noise = (mask, key, scaled_grid_surface(indices, palette, self.cell_size))
+        rect = self.screen.blit(self.noise[2], (0, 0))
+        self.overlays.append(rect)
+        self.dirty.append(rect)
+
+    def blit(self, surface, pos):
+        """Blit a surface (usually text) on screen for this frame only"""
+        rect = self.screen.blit(surface, pos)
+        self.overlays.append(rect)
+        self.dirty.append(rect)
+        return rect
+
+    def present(self):
+        """Push the changed parts of the frame to the window"""
+        if self.full_redraw or len(self.dirty) > MAX_DIRTY_RECTS:
+            pygame.display.update()
+        else:
+            pygame.display.update(self.dirty)
+        self.dirty = []
+        self.full_redraw = False
@@ -0,0 +1,175 @@
+# maze_streaming.py - Endless maze that is generated row by row with Eller's algorithm
+# A standalone prototype, not reachable from the menu: python maze_streaming.py
+import random
+from collections import OrderedDict
+
+import numpy as np
+import pygame
+
+from maze_grid import WALL, PATH
+from maze_generators import eller_rows
+from maze_renderer import cell_palette, scaled_grid_surface
+
+CHUNK_ROWS = 32  # Grid rows per chunk (16 rows of maze cells), must be even
+
+# Colors
+WHITE = (255, 255, 255)
+BLACK = (0, 0, 0)
+BLUE = (0, 0, 255)
+RED = (255, 0, 0)
+
+class ChunkedMazeStore:
+    """Chunk-addressed maze rows with least-recently-used eviction.
+
+    Only loading a chunk (put) and the player entering it (touch) count as
+    a use. Reads through peek and cell leave the order alone, so a drawing
+    sweep over the viewport cannot push out the chunks the player needs.
+    """
+    def __init__(self, width, chunk_rows=CHUNK_ROWS, max_chunks=8):
+        self.width = width
+        self.chunk_rows = chunk_rows
+        self.max_chunks = max_chunks
+        self.chunks = OrderedDict()  # chunk index -> uint8 array of shape (chunk_rows, width)
+
+    def __contains__(self, index):
+        return index in self.chunks
+
+    def __len__(self):
+        return len(self.chunks)
+
+    def peek(self, index):
+        """Return a resident chunk or None if evicted, without marking it used"""
+        return self.chunks.get(index)
+
+    def touch(self, index):
+        """Mark a resident chunk as most recently used"""
+        if index in self.chunks:
+            self.chunks.move_to_end(index)
+
+    def put(self, index, chunk):
+        """Store a chunk, evicting the least recently used ones over the limit"""
+        self.chunks[index] = chunk
+        self.chunks.move_to_end(index)
+        while len(self.chunks) > self.max_chunks:
+            self.chunks.popitem(last=False)
+
+    def cell(self, x, y):
+        """Cell type at (x, y); rows of evicted chunks read as walls"""
+        chunk = self.peek(y // self.chunk_rows)
+        if chunk is None:
+            return WALL
+        return chunk.item(y % self.chunk_rows, x)
+
+    def resident(self):
+        """Indices of the chunks currently in memory"""
+        return sorted(self.chunks)
+
+class StreamingMazeGenerator:
+    """Endless-runner maze that grows downward as the player approaches.
+
+    Eller's algorithm only needs the sets of the current row, so new chunks
+    are appended one at a time and memory stays bounded by max_chunks no
+    matter how deep the player goes. Evicted chunks are gone for good; they
+    read as walls, so the way back up closes behind the player.
+    """
+    def __init__(self, grid_size, rng=random, lookahead_chunks=2, max_chunks=8):
+        if max_chunks < lookahead_chunks + 2:
+            raise ValueError("max_chunks must leave room for the visible and look-ahead chunks")
+        self.grid_size = grid_size  # Maze width in grid cells
+        self.rng = rng
+        self.lookahead_chunks = lookahead_chunks
+        self.max_chunks = max_chunks
+        self.palette = cell_palette({PATH: WHITE})
+        self.generate()
+
+    def generate(self):
+        """Start a fresh endless maze"""
+        self.store = ChunkedMazeStore(self.grid_size, CHUNK_ROWS, self.max_chunks)
+        self.rows = eller_rows((self.grid_size + 1) // 2, self.rng)
+        self.next_chunk = 0
+        self.update(0)
+        return self.store
+
+    def _build_chunk(self):
+        """Stream the next CHUNK_ROWS grid rows out of Eller's algorithm"""
+        chunk = np.zeros((CHUNK_ROWS, self.grid_size), dtype=np.uint8)
+        for row in range(0, CHUNK_ROWS, 2):
+            east, south = next(self.rows)
+            chunk[row, ::2] = PATH
+            chunk[row, 1::2][east] = PATH
+            chunk[row + 1, ::2][south] = PATH
+        self.store.put(self.next_chunk, chunk)
+        self.next_chunk += 1
+
+    def update(self, player_y):
+        """Mark the player's chunk as used and make sure the chunks ahead of it exist"""
+        self.store.touch(player_y // CHUNK_ROWS)
+        target = player_y // CHUNK_ROWS + self.lookahead_chunks
+        while self.next_chunk <= target:
+            self._build_chunk()
+
+    def is_walkable(self, x, y):
+        return 0 <= x < self.grid_size and y >= 0 and self.store.cell(x, y) == PATH
+
+    def draw(self, screen, cell_size, player_pos, camera_y):
+        """Draw the resident chunks that overlap the viewport and the player"""
+        screen.fill(BLACK)
+        visible_rows = screen.get_height() // cell_size + 1
+        first_chunk = camera_y // CHUNK_ROWS
+        last_chunk = (camera_y + visible_rows) // CHUNK_ROWS
+
+        for index in range(first_chunk, last_chunk + 1):
+            chunk = self.store.peek(index)
+            if chunk is None:
+                continue
+            # Only the rows of this chunk that are on screen
+            top = max(camera_y - index * CHUNK_ROWS, 0)
+            bottom = min(camera_y + visible_rows - index * CHUNK_ROWS, CHUNK_ROWS)
+            offset = index * CHUNK_ROWS - camera_y
+            rows = scaled_grid_surface(chunk[top:bottom], self.palette, cell_size)
+            screen.blit(rows, (0, (offset + top) * cell_size))
+
+        player_x, player_y = player_pos
+        pygame.draw.rect(screen, BLUE, (player_x * cell_size, (player_y - camera_y) * cell_size, cell_size, cell_size))
+
+if __name__ == "__main__":
+    # Standalone endless mode: walk down as far as you can
+    pygame.init()
+    WIDTH, HEIGHT = 800, 800
+    GRID_SIZE = 21
+    CELL_SIZE = WIDTH // GRID_SIZE
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    pygame.display.set_caption("Quantum Maze Game - Endless")
+    font = pygame.font.Font(None, 36)
+
+    maze = StreamingMazeGenerator(GRID_SIZE)
+    player_x, player_y = 0, 0
+    keys_pressed = {pygame.K_w: (0, -1), pygame.K_s: (0, 1), pygame.K_a: (-1, 0), pygame.K_d: (1, 0)}
+    held = set()
+
+    running = True
+    clock = pygame.time.Clock()
+    while running:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False
+            elif event.type == pygame.KEYDOWN and event.key in keys_pressed:
+                held.add(event.key)
+            elif event.type == pygame.KEYUP:
+                held.discard(event.key)
+
+        for key in held:
+            dx, dy = keys_pressed[key]
+            if maze.is_walkable(player_x + dx, player_y + dy):
+                player_x, player_y = player_x + dx, player_y + dy
+        maze.update(player_y)
+
+        # Keep the player in the upper third of the screen
+        camera_y = max(0, player_y - HEIGHT // CELL_SIZE // 3)
+        maze.draw(screen, CELL_SIZE, (player_x, player_y), camera_y)
+        depth_text = font.render(f"Depth: {player_y}", True, RED)
+        screen.blit(depth_text, (10, 10))
+        pygame.display.update()
+        clock.tick(10)
+
+    pygame.quit()
@@ -3,9 +3,15 @@ import random
 import time
 import subprocess
 import sqlite3
-import sys
-import os
-import cv2  # Added OpenCV for video handling
+import tutorial_video
+from maze_grid import OpenCellIndex, PATH, DOOR, EXIT, POWERUP
+from maze_pool import take_level_maze
+from text_cache import render_text
+from maze_renderer import MazeRenderer, BlinkNoise
+from level_rules import LEVEL_PARAMS
+from fixed_timestep import FixedTimestep, HeldKeys
+from frame_scheduler import FrameScheduler, target_fps, stats_requested
+from level_prefetch import TitleCard, prefetch_level
 
 
 # Initialize Pygame
@@ -14,6 +20,8 @@ pygame.init()
 # Screen settings - Increased from 600x600 to 800x800
 WIDTH, HEIGHT = 800, 800
 GRID_SIZE = 21
+MAZE_ALGORITHM = "backtracker"  # Any name registered in maze_generators
+MAX_DOOR_PAIRS = None  # Entangled door pairs; None scales with the maze size (3 on 21x21)
 CELL_SIZE = WIDTH // GRID_SIZE
 screen = pygame.display.set_mode((WIDTH, HEIGHT))
 pygame.display.set_caption("Quantum Maze Game")
@@ -30,9 +38,10 @@ YELLOW = (255, 255, 0)
 BUTTON_COLOR = (200, 200, 200)
 BUTTON_HOVER = (150, 150, 150)
 
-# Game constants
-SUPERPOSITION_DURATION = 5  # Seconds before doors return to superposition
-TELEPORT_COOLDOWN = 15      # Seconds between forced teleports
+# Game constants, shared with the headless simulation
+RULES = LEVEL_PARAMS[3]
+SUPERPOSITION_DURATION = RULES["superposition_duration"]  # Seconds before doors return to superposition
+TELEPORT_COOLDOWN = RULES["teleport_interval"]  # Seconds between forced teleports
 
 # Database setup
 db_file = "quantum_maze_data.db"
@@ -129,129 +138,11 @@ def show_start_screen():
     text_rect = text.get_rect(center=(WIDTH // 2, HEIGHT // 2))
     screen.blit(text, text_rect)
     pygame.display.update()
-    time.sleep(2)
+    return TitleCard(2)  # Stays up while the level loads behind it
 
-# Function to show tutorial video with OpenCV
+# Function to show the tutorial video, from the frame cache once it has been played
 def show_tutorial_video():
-    # Create a start button
-    button_rect = pygame.Rect(WIDTH // 2 - 60, HEIGHT - 70, 120, 40)
-    
-    video_path = "3.mp4"  # Changed to 3.mp4 for Level 3
-    
-    # Check if video file exists
-    if not os.path.exists(video_path):
-        print(f"Error: Video file '{video_path}' not found.")
-        return False  # Skip video and start the game
-    
-    try:
-        # Open the video file with OpenCV
-        cap = cv2.VideoCapture(video_path)
-        if not cap.isOpened():
-            print("Error opening video file")
-            return False
-        
-        # Get video properties
-        frame_width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-        frame_height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-        fps = cap.get(cv2.CAP_PROP_FPS)
-        
-        # Calculate scaling to fit video on screen
-        max_video_height = HEIGHT - 150  # Leave more space for title and button
-        scale = min(WIDTH / frame_width, max_video_height / frame_height)
-        display_width = int(frame_width * scale)
-        display_height = int(frame_height * scale)
-        
-        # Calculate position to center video - move it down to leave space for title
-        video_x = (WIDTH - display_width) // 2
-        video_y = (HEIGHT - display_height - 100) // 2 + 30  # Add offset to push video down
-        
-        # Position for the tutorial text - ensure it's higher than the video
-        tutorial_text_y = video_y - 30
-        
-        # For controlling video timing
-        clock = pygame.time.Clock()
-        last_frame_time = time.time() * 1000  # Current time in milliseconds
-        frame_time = 1000 / fps if fps > 0 else 33  # milliseconds per frame
-        
-        running = True
-        while running:
-            # Handle events
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    cap.release()
-                    pygame.quit()
-                    sys.exit()
-                elif event.type == pygame.MOUSEBUTTONDOWN:
-                    if button_rect.collidepoint(event.pos):
-                        running = False  # Start the game
-            
-            # Strictly control frame timing to ensure constant playback speed
-            current_time = time.time() * 1000
-            if current_time - last_frame_time >= frame_time:
-                # Read the next frame
-                ret, frame = cap.read()
-                
-                # If the video ended, loop back to beginning
-                if not ret:
-                    cap.set(cv2.CAP_PROP_POS_FRAMES, 0)  # Rewind to beginning
-                    ret, frame = cap.read()
-                    if not ret:  # If still can't read, there's a problem
-                        break
-                
-                # Apply rotation (90 degrees clockwise) and vertical flip transformations
-                # 1. Rotate 90 degrees clockwise
-                # Apply rotation (90 degrees counterclockwise two times)
-                frame = cv2.rotate(frame, cv2.ROTATE_90_COUNTERCLOCKWISE)  # First rotation
-                # Second rotation
-
-                # 2. Flip vertically (up/down)
-                frame = cv2.flip(frame, 0)
-                
-                # Convert OpenCV BGR to RGB for Pygame
-                frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                
-                # Resize for display
-                frame = cv2.resize(frame, (display_width, display_height))
-                
-                # Convert to Pygame surface
-                video_surf = pygame.Surface((display_width, display_height))
-                pygame.surfarray.blit_array(video_surf, frame)
-                
-                # Clear screen
-                screen.fill(BLACK)
-                
-                # Add "Tutorial - Level 3" text - draw this BEFORE the video
-                tutorial_text = font.render("Tutorial - Level 3", True, WHITE)  # Changed to Level 3
-                tutorial_text_rect = tutorial_text.get_rect(center=(WIDTH // 2, tutorial_text_y))
-                screen.blit(tutorial_text, tutorial_text_rect)
-                
-                # Display video frame
-                screen.blit(video_surf, (video_x, video_y))
-                
-                # Draw start button
-                mouse_pos = pygame.mouse.get_pos()
-                button_color = BUTTON_HOVER if button_rect.collidepoint(mouse_pos) else BUTTON_COLOR
-                pygame.draw.rect(screen, button_color, button_rect)
-                button_text = button_font.render("Start", True, BLACK)
-                text_rect = button_text.get_rect(center=button_rect.center)
-                screen.blit(button_text, text_rect)
-                
-                pygame.display.update()
-                
-                # Update the last frame time
-                last_frame_time = current_time
-            
-            # Only tick at a high rate to handle events responsively,
-            # but actual frame display is controlled by our manual timing
-            clock.tick(60)
-        
-        # Clean up
-        cap.release()
-        return True
-        
-    except Exception as e:
-        print(f"Error playing video: {e}")
-        return False  # Skip video and start the game
+    return tutorial_video.show_tutorial_video(screen, "3.mp4", "Tutorial - Level 3", font, button_font, tutorial)
 
 def show_end_screen(completion_time):
     # Save to database
@@ -301,126 +192,68 @@ def show_end_screen(completion_time):
                     subprocess.run(["python", "enemy_Level4.py"])
                     exit()
 
-# Show start screen before the game begins
-show_start_screen()
+def generate_maze():
+    return take_level_maze(3, GRID_SIZE, MAZE_ALGORITHM, max_pairs=MAX_DOOR_PAIRS)
+
+# Show start screen before the game begins; the tutorial and the maze load while it is up
+title_card = show_start_screen()
+tutorial = tutorial_video.preload(screen, "3.mp4")
+maze, door_states, entangled_pairs, door_pair_timers = generate_maze()
+title_card.hold()
 
 # Show tutorial video
 if show_tutorial_video():
     # Reset start_time after the tutorial video
     start_time = time.time()
 
+# Gameplay starts here: Level 4 warms up while this one is played
+prefetch_level(4)
+
 # Tunneling variables
-tunneling_probability = 20  
-tunnel_cooldown_time = 10  
+tunneling_probability = RULES["tunneling_probability"]
+tunnel_cooldown_time = RULES["tunnel_cooldown"]
 last_tunnel_time = 0  
 
-def generate_maze():
-    maze = [[0 for _ in range(GRID_SIZE)] for _ in range(GRID_SIZE)]
-    stack = [(random.randint(0, GRID_SIZE // 2) * 2, random.randint(0, GRID_SIZE // 2) * 2)]
-    visited = set(stack)
-    
-    directions = [(0, 2), (2, 0), (0, -2), (-2, 0)]
-    while stack:
-        x, y = stack[-1]
-        random.shuffle(directions)
-        found = False
-        for dx, dy in directions:
-            nx, ny = x + dx, y + dy
-            if 0 <= nx < GRID_SIZE and 0 <= ny < GRID_SIZE and (nx, ny) not in visited:
-                maze[y][x] = 1  
-                maze[ny][nx] = 1  
-                maze[y + dy // 2][x + dx // 2] = 1  
-                stack.append((nx, ny))
-                visited.add((nx, ny))
-                found = True
-                break
-        if not found:
-            stack.pop()
-    
-    maze[0][0] = 1  
-    maze[GRID_SIZE - 1][GRID_SIZE - 1] = 3  
-
-    door_states = {}
-    door_positions = []
-    door_pair_timers = {}
-
-    # Find valid door positions
-    for row in range(1, GRID_SIZE - 1):
-        for col in range(1, GRID_SIZE - 1):
-            if maze[row][col] == 1:  
-                wall_neighbors = sum(
-                    maze[row + dr][col + dc] == 0
-                    for dr, dc in [(-1, 0), (1, 0), (0, -1), (0, 1)]
-                )
-                if wall_neighbors == 2:  
-                    door_positions.append((col, row))
-
-    random.shuffle(door_positions)
-    entangled_pairs = []
-    
-    # Limit to exactly 3 pairs
-    max_pairs = 3  
-    for i in range(0, max_pairs * 2, 2):  
-        door1, door2 = door_positions[i], door_positions[i + 1]
-        maze[door1[1]][door1[0]] = 2  
-        maze[door2[1]][door2[0]] = 2  
-        door_states[door1] = None  # Start in superposition
-        door_states[door2] = None  # Start in superposition
-        entangled_pairs.append((door1, door2))
-
-    # Add tunneling power-ups (yellow cells)
-    for _ in range(3):  
-        while True:
-            ex, ey = random.randint(1, GRID_SIZE - 2), random.randint(1, GRID_SIZE - 2)
-            if maze[ey][ex] == 1:
-                maze[ey][ex] = 4  
-                break
-
-    return maze, door_states, entangled_pairs, door_pair_timers
-
 player_x, player_y = 0, 0
-maze, door_states, entangled_pairs, door_pair_timers = generate_maze()
+previous_player = (player_x, player_y)  # Position before the last tick, for smooth drawing
+open_cells = OpenCellIndex.of(maze, PATH)  # Teleport targets, sampled in O(1)
+blink_noise = BlinkNoise(maze.cells.shape, ring_size=16)  # Precomputed superposition flicker
+noise = blink_noise.next_mask()  # One mask per tick drives both the path and the door flicker
+renderer = MazeRenderer(screen, maze, CELL_SIZE, {PATH: WHITE, EXIT: GREEN, POWERUP: YELLOW})
 start_time = time.time()
 last_teleport_time = time.time()
 blinking = False
 keys_enabled = True
 blink_position = None
-keys_pressed = {pygame.K_w: False, pygame.K_s: False, pygame.K_a: False, pygame.K_d: False}
+keys_pressed = HeldKeys((pygame.K_w, pygame.K_s, pygame.K_a, pygame.K_d))
 blink_disabled_until = 0  # Time until which keys should be disabled (2 seconds after blinking starts)
 
 def draw_maze():
-    for row in range(GRID_SIZE):
-        for col in range(GRID_SIZE):
-            if maze[row][col] == 1:
-                color = WHITE if not blinking else random.choice([WHITE, PURPLE])
-            elif maze[row][col] == 3:
-                color = GREEN
-            elif maze[row][col] == 2:
-                door_pos = (col, row)
-                state = door_states.get(door_pos, None)
-                if state is None:  # Superposition
-                    color = random.choice([RED, WHITE_DOOR])
-                elif state:  # Passable
-                    color = WHITE_DOOR
-                else:  # Impassable
-                    color = RED
-            elif maze[row][col] == 4:
-                color = YELLOW
-            else:
-                color = BLACK
-            pygame.draw.rect(screen, color, (col * CELL_SIZE, row * CELL_SIZE, CELL_SIZE, CELL_SIZE))
+    # The static maze is cached in the renderer; only what changes is drawn here
+    renderer.begin_frame()
+    if blinking:
+        renderer.draw_noise(noise, (PATH,), PURPLE)
+
+    for door_pos, state in door_states.items():
+        if state is None:  # Superposition
+            color = RED if noise[door_pos[1], door_pos[0]] else WHITE_DOOR
+        elif state:  # Passable
+            color = WHITE_DOOR
+        else:  # Impassable
+            color = RED
+        renderer.draw_cell(door_pos[0], door_pos[1], color)
     
     if not blinking:
-        pygame.draw.rect(screen, BLUE, (player_x * CELL_SIZE, player_y * CELL_SIZE, CELL_SIZE, CELL_SIZE))
+        renderer.draw_moving_cell(previous_player, (player_x, player_y), timestep.alpha, BLUE)
     
     elapsed_time = int(time.time() - start_time)
-    timer_text = font.render(f"Time: {elapsed_time}s", True, (255, 0, 0))
-    prob_text = font.render(f"Tunnel %: {tunneling_probability}%", True, YELLOW)
-    tunnel_cd_text = font.render(f"Tunnel CD: {max(0, tunnel_cooldown_time - int(time.time() - last_tunnel_time))}s", True, RED)
+    timer_text = render_text(font, f"Time: {elapsed_time}s", (255, 0, 0))
+    prob_text = render_text(font, f"Tunnel %: {tunneling_probability}%", YELLOW)
+    tunnel_cd_text = render_text(font, f"Tunnel CD: {max(0, tunnel_cooldown_time - int(time.time() - last_tunnel_time))}s", RED)
     
-    screen.blit(timer_text, (10, 10))
-    screen.blit(prob_text, (10, 40))
-    screen.blit(tunnel_cd_text, (10, 70))
+    renderer.blit(timer_text, (10, 10))
+    renderer.blit(prob_text, (10, 40))
+    renderer.blit(tunnel_cd_text, (10, 70))
 
 def move_player(dx, dy):
     global player_x, player_y, tunneling_probability
@@ -429,24 +262,26 @@ def move_player(dx, dy):
     
     new_x, new_y = player_x + dx, player_y + dy
     if 0 <= new_x < GRID_SIZE and 0 <= new_y < GRID_SIZE:
-        if maze[new_y][new_x] == 2:
+        if maze[new_y, new_x] == DOOR:
             if door_states.get((new_x, new_y)) is True:  # Only pass through open doors
                 player_x, player_y = new_x, new_y
-        elif maze[new_y][new_x] in [1, 3, 4]:
-            if maze[new_y][new_x] == 4:  # Tunneling power-up
-                tunneling_probability = min(100, tunneling_probability + 10)
-                maze[new_y][new_x] = 1  # Convert to normal path after collecting
+        elif maze[new_y, new_x] in (PATH, EXIT, POWERUP):
+            if maze[new_y, new_x] == POWERUP:  # Tunneling power-up
+                tunneling_probability = min(100, tunneling_probability + RULES["power_up_bonus"])
+                maze[new_y, new_x] = PATH  # Convert to normal path after collecting
+                open_cells.cell_changed((new_x, new_y), PATH)
+                renderer.repaint_cells([(new_x, new_y)])
             player_x, player_y = new_x, new_y
         
-        if maze[new_y][new_x] == 3:
+        if maze[new_y, new_x] == EXIT:
             completion_time = int(time.time() - start_time)
             show_end_screen(completion_time)
 
 def teleport_player():
     global player_x, player_y, keys_enabled, blinking, last_teleport_time
-    valid_positions = [(x, y) for y in range(GRID_SIZE) for x in range(GRID_SIZE) if maze[y][x] == 1]
-    if valid_positions:
-        player_x, player_y = random.choice(valid_positions)
+    position = open_cells.choice()
+    if position:
+        player_x, player_y = position
     keys_enabled = True
     blinking = False
     last_teleport_time = time.time()
@@ -454,7 +289,7 @@ def teleport_player():
 def is_adjacent_to_door():
     for dx, dy in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
         adj_x, adj_y = player_x + dx, player_y + dy
-        if 0 <= adj_x < GRID_SIZE and 0 <= adj_y < GRID_SIZE and maze[adj_y][adj_x] == 2:
+        if 0 <= adj_x < GRID_SIZE and 0 <= adj_y < GRID_SIZE and maze[adj_y, adj_x] == DOOR:
             return (adj_x, adj_y)
     return None
 
@@ -463,7 +298,7 @@ def has_red_neighbor(door):
     for dx, dy in [(-1,0), (1,0), (0,-1), (0,1)]:
         nx, ny = x + dx, y + dy
         if 0 <= nx < GRID_SIZE and 0 <= ny < GRID_SIZE:
-            if maze[ny][nx] == 2 and door_states.get((nx, ny)) == False:
+            if maze[ny, nx] == DOOR and door_states.get((nx, ny)) == False:
                 return True
     return False
 
@@ -512,34 +347,47 @@ def attempt_tunneling(dx, dy):
         if 0 <= new_x < GRID_SIZE and 0 <= new_y < GRID_SIZE:
             player_x, player_y = new_x, new_y  
 
-running = True
-clock = pygame.time.Clock()
-
-while running:
-    screen.fill(BLACK)
+def update():
+    """One simulation tick: door and blink timing, flicker and movement"""
+    global blinking, keys_enabled, blink_disabled_until, noise, previous_player
+    
+    previous_player = (player_x, player_y)
     check_door_superposition()
-    draw_maze()
-    pygame.display.update()
     
     current_time = time.time()
     # Changed from 10 to 15 seconds for blinking interval
     if current_time - last_teleport_time >= TELEPORT_COOLDOWN and not blinking:
         blinking = True
         keys_enabled = False
-        blink_disabled_until = current_time + 2  # Disable keys for 2 seconds after blinking starts
+        blink_disabled_until = current_time + RULES["blink_lock"]  # Disable keys for 2 seconds after blinking starts
+    
+    noise = blink_noise.next_mask()
     
-    for event in pygame.event.get():
+    if keys_enabled:
+        if keys_pressed[pygame.K_w]: move_player(0, -1)
+        if keys_pressed[pygame.K_s]: move_player(0, 1)
+        if keys_pressed[pygame.K_a]: move_player(-1, 0)
+        if keys_pressed[pygame.K_d]: move_player(1, 0)
+    keys_pressed.end_tick()
+
+# Logic runs at a fixed tick; input and drawing run at the display frame rate
+running = True
+timestep = FixedTimestep()
+scheduler = FrameScheduler(target_fps(), report=stats_requested())
+
+while running:
+    for event in scheduler.next_events():
         if event.type == pygame.QUIT:
             running = False
         elif event.type == pygame.KEYDOWN:
-            if current_time < blink_disabled_until:
+            if time.time() < blink_disabled_until:
                 continue  # Skip key presses for 2 seconds after blinking starts
             
             if blinking:
                 teleport_player()
             elif keys_enabled:
                 if event.key in keys_pressed:
-                    keys_pressed[event.key] = True
+                    keys_pressed.press(event.key)
                 elif event.key == pygame.K_f:
                     toggle_door()
                 elif event.key == pygame.K_SPACE:
@@ -549,14 +397,12 @@ while running:
                     attempt_tunneling(dx, dy)
         elif event.type == pygame.KEYUP:
             if event.key in keys_pressed:
-                keys_pressed[event.key] = False
+                keys_pressed.release(event.key)
     
-    if keys_enabled:
-        if keys_pressed[pygame.K_w]: move_player(0, -1)
-        if keys_pressed[pygame.K_s]: move_player(0, 1)
-        if keys_pressed[pygame.K_a]: move_player(-1, 0)
-        if keys_pressed[pygame.K_d]: move_player(1, 0)
+    for _ in range(timestep.ticks()):
+        update()
     
-    clock.tick(10)
+    draw_maze()
+    renderer.present()
 
-pygame.quit()
\ No newline at end of file
+pygame.quit()
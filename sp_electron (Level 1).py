@@ -1,11 +1,17 @@
 import pygame
-import random
 import time
 import os
 import sqlite3
-import cv2  # Added OpenCV for video handling
-import sys
+import tutorial_video
 import subprocess
+from maze_grid import OpenCellIndex, PATH, EXIT
+from maze_pool import take_level_maze
+from text_cache import render_text
+from maze_renderer import MazeRenderer, BlinkNoise
+from level_rules import LEVEL_PARAMS
+from fixed_timestep import FixedTimestep, HeldKeys
+from frame_scheduler import FrameScheduler, target_fps, stats_requested
+from level_prefetch import TitleCard, prefetch_level
 
 # Initialize Pygame
 pygame.init()
@@ -14,6 +20,7 @@ pygame.init()
 # Screen settings - Increased from 600x600 to 800x800
 WIDTH, HEIGHT = 800, 800
 GRID_SIZE = 21
+MAZE_ALGORITHM = "backtracker"  # Any name registered in maze_generators
 CELL_SIZE = WIDTH // GRID_SIZE
 screen = pygame.display.set_mode((WIDTH, HEIGHT))
 pygame.display.set_caption("Quantum Maze Game")
@@ -29,6 +36,9 @@ GRAY = (150, 150, 150)
 BUTTON_COLOR = (200, 200, 200)
 BUTTON_HOVER = (150, 150, 150)
 
+# Rule constants, shared with the headless simulation
+RULES = LEVEL_PARAMS[1]
+
 font = pygame.font.Font(None, 36)
 button_font = pygame.font.Font(None, 32)  # Font for the button
 
@@ -121,154 +131,20 @@ def show_level_screen():
     text_rect = text.get_rect(center=(WIDTH // 2, HEIGHT // 2))
     screen.blit(text, text_rect)
     pygame.display.update()
-    time.sleep(2)
+    return TitleCard(2)  # Stays up while the level loads behind it
 
-# Function to show tutorial video with OpenCV
+# Function to show the tutorial video, from the frame cache once it has been played
 def show_tutorial_video():
-    # Create a start button
-    button_rect = pygame.Rect(WIDTH // 2 - 60, HEIGHT - 70, 120, 40)
-    
-    video_path = "1.mp4"  # Changed to 1.mp4 for Level 1
-    
-    # Check if video file exists
-    if not os.path.exists(video_path):
-        print(f"Error: Video file '{video_path}' not found.")
-        return False  # Skip video and start the game
-    
-    try:
-        # Open the video file with OpenCV
-        cap = cv2.VideoCapture(video_path)
-        if not cap.isOpened():
-            print("Error opening video file")
-            return False
-        
-        # Get video properties
-        frame_width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-        frame_height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-        fps = cap.get(cv2.CAP_PROP_FPS)
-        
-        # Calculate scaling to fit video on screen
-        max_video_height = HEIGHT - 150  # Leave more space for title and button
-        scale = min(WIDTH / frame_width, max_video_height / frame_height)
-        display_width = int(frame_width * scale)
-        display_height = int(frame_height * scale)
-        
-        # Calculate position to center video - move it down to leave space for title
-        video_x = (WIDTH - display_width) // 2
-        video_y = (HEIGHT - display_height - 100) // 2 + 30  # Add offset to push video down
-        
-        # Position for the tutorial text - ensure it's higher than the video
-        tutorial_text_y = video_y - 30
-        
-        # For controlling video timing
-        clock = pygame.time.Clock()
-        last_frame_time = time.time() * 1000  # Current time in milliseconds
-        frame_time = 1000 / fps if fps > 0 else 33  # milliseconds per frame
-        
-        running = True
-        while running:
-            # Handle events
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    cap.release()
-                    pygame.quit()
-                    sys.exit()
-                elif event.type == pygame.MOUSEBUTTONDOWN:
-                    if button_rect.collidepoint(event.pos):
-                        running = False  # Start the game
-            
-            # Strictly control frame timing to ensure constant playback speed
-            current_time = time.time() * 1000
-            if current_time - last_frame_time >= frame_time:
-                # Read the next frame
-                ret, frame = cap.read()
-                
-                # If the video ended, loop back to beginning
-                if not ret:
-                    cap.set(cv2.CAP_PROP_POS_FRAMES, 0)  # Rewind to beginning
-                    ret, frame = cap.read()
-                    if not ret:  # If still can't read, there's a problem
-                        break
-                
-                # Apply rotation (90 degrees clockwise) and vertical flip transformations
-                frame = cv2.rotate(frame, cv2.ROTATE_90_COUNTERCLOCKWISE)  # First rotation
-                frame = cv2.flip(frame, 0)  # Flip vertically
-                
-                # Convert OpenCV BGR to RGB for Pygame
-                frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                
-                # Resize for display
-                frame = cv2.resize(frame, (display_width, display_height))
-                
-                # Convert to Pygame surface
-                video_surf = pygame.Surface((display_width, display_height))
-                pygame.surfarray.blit_array(video_surf, frame)
-                
-                # Clear screen
-                screen.fill(BLACK)
-                
-                # Add "Tutorial - Level 1" text - draw this BEFORE the video
-                tutorial_text = font.render("Tutorial - Level 1", True, WHITE)  # Changed to Level 1
-                tutorial_text_rect = tutorial_text.get_rect(center=(WIDTH // 2, tutorial_text_y))
-                screen.blit(tutorial_text, tutorial_text_rect)
-                
-                # Display video frame
-                screen.blit(video_surf, (video_x, video_y))
-                
-                # Draw start button
-                mouse_pos = pygame.mouse.get_pos()
-                button_color = BUTTON_HOVER if button_rect.collidepoint(mouse_pos) else BUTTON_COLOR
-                pygame.draw.rect(screen, button_color, button_rect)
-                button_text = button_font.render("Start", True, BLACK)
-                text_rect = button_text.get_rect(center=button_rect.center)
-                screen.blit(button_text, text_rect)
-                
-                pygame.display.update()
-                
-                # Update the last frame time
-                last_frame_time = current_time
-            
-            # Only tick at a high rate to handle events responsively,
-            # but actual frame display is controlled by our manual timing
-            clock.tick(60)
-        
-        # Clean up
-        cap.release()
-        return True
-        
-    except Exception as e:
-        print(f"Error playing video: {e}")
-        return False  # Skip video and start the game
+    return tutorial_video.show_tutorial_video(screen, "1.mp4", "Tutorial - Level 1", font, button_font, tutorial)
 
 def generate_maze():
-    maze = [[0 for _ in range(GRID_SIZE)] for _ in range(GRID_SIZE)]
-    stack = [(random.randint(0, GRID_SIZE // 2) * 2, random.randint(0, GRID_SIZE // 2) * 2)]
-    visited = set(stack)
-    
-    directions = [(0, 2), (2, 0), (0, -2), (-2, 0)]
-    while stack:
-        x, y = stack[-1]
-        random.shuffle(directions)
-        found = False
-        for dx, dy in directions:
-            nx, ny = x + dx, y + dy
-            if 0 <= nx < GRID_SIZE and 0 <= ny < GRID_SIZE and (nx, ny) not in visited:
-                maze[y][x] = 1
-                maze[ny][nx] = 1
-                maze[y + dy // 2][x + dx // 2] = 1
-                stack.append((nx, ny))
-                visited.add((nx, ny))
-                found = True
-                break
-        if not found:
-            stack.pop()
-    
-    maze[0][0] = 1
-    maze[GRID_SIZE - 1][GRID_SIZE - 1] = 3
-    return maze
+    return take_level_maze(1, GRID_SIZE, MAZE_ALGORITHM)
 
-# Show level screen
-show_level_screen()
+# Show level screen; the tutorial and the maze load while it is up
+title_card = show_level_screen()
+tutorial = tutorial_video.preload(screen, "1.mp4")
+maze = generate_maze()
+title_card.hold()
 
 # Show tutorial video
 if show_tutorial_video():
@@ -277,38 +153,38 @@ if show_tutorial_video():
 else:
     start_time = time.time()
 
+# Gameplay starts here: Level 2 warms up while this one is played
+prefetch_level(2)
+
 # Initialize player position
 player_x, player_y = 0, 0
-maze = generate_maze()
+previous_player = (player_x, player_y)  # Position before the last tick, for smooth drawing
+open_cells = OpenCellIndex.of(maze, PATH)  # Teleport targets, sampled in O(1)
+renderer = MazeRenderer(screen, maze, CELL_SIZE, {PATH: WHITE, EXIT: GREEN})
+blink_noise = BlinkNoise(maze.cells.shape, ring_size=16)  # Precomputed superposition flicker
+blink_mask = None  # Flicker of the current tick
 last_teleport_time = time.time()
 blinking = False
 keys_enabled = True
 blink_start_time = None
 
-keys_pressed = {pygame.K_w: False, pygame.K_s: False, pygame.K_a: False, pygame.K_d: False}
+keys_pressed = HeldKeys((pygame.K_w, pygame.K_s, pygame.K_a, pygame.K_d))
 
 def get_random_open_position():
     """Returns a random position in the maze that is a path (not a wall)"""
-    open_positions = [(x, y) for y in range(GRID_SIZE) for x in range(GRID_SIZE) if maze[y][x] == 1]
-    return random.choice(open_positions)
+    return open_cells.choice()
 
 def draw_maze():
-    for row in range(GRID_SIZE):
-        for col in range(GRID_SIZE):
-            if maze[row][col] == 1:
-                color = random.choice([WHITE, PURPLE]) if blinking else WHITE
-            elif maze[row][col] == 3:
-                color = GREEN
-            else:
-                color = BLACK
-            pygame.draw.rect(screen, color, (col * CELL_SIZE, row * CELL_SIZE, CELL_SIZE, CELL_SIZE))
-    
-    if not blinking:
-        pygame.draw.rect(screen, BLUE, (player_x * CELL_SIZE, player_y * CELL_SIZE, CELL_SIZE, CELL_SIZE))
+    # The static maze is cached in the renderer; only what changes is drawn here
+    renderer.begin_frame()
+    if blinking:
+        renderer.draw_noise(blink_mask, (PATH,), PURPLE)
+    else:
+        renderer.draw_moving_cell(previous_player, (player_x, player_y), timestep.alpha, BLUE)
 
     elapsed_time = int(time.time() - start_time)
-    timer_text = font.render(f"Time: {elapsed_time}s", True, RED)
-    screen.blit(timer_text, (10, 10))
+    timer_text = render_text(font, f"Time: {elapsed_time}s", RED)
+    renderer.blit(timer_text, (10, 10))
 
 def move_player(dx, dy):
     global player_x, player_y
@@ -318,10 +194,10 @@ def move_player(dx, dy):
 
     new_x, new_y = player_x + dx, player_y + dy
 
-    if 0 <= new_x < GRID_SIZE and 0 <= new_y < GRID_SIZE and maze[new_y][new_x] in [1, 3]:
+    if maze.is_walkable(new_x, new_y):
         player_x, player_y = new_x, new_y
 
-        if maze[new_y][new_x] == 3:
+        if maze[new_y, new_x] == EXIT:
             show_completion_screen()
 
 def show_completion_screen():
@@ -368,26 +244,39 @@ def show_completion_screen():
                     os.system("python sp_doors-Level2.py")
                     exit()
 
-running = True
-clock = pygame.time.Clock()
+def update():
+    """One simulation tick: blink timing and movement"""
+    global blinking, keys_enabled, blink_start_time, blink_mask, previous_player
 
-while running:
-    screen.fill(BLACK)
-    draw_maze()
-    pygame.display.update()
-    
+    previous_player = (player_x, player_y)
     current_time = time.time()
 
-    if current_time - last_teleport_time >= 10 and not blinking:
+    if current_time - last_teleport_time >= RULES["teleport_interval"] and not blinking:
         blinking = True
         keys_enabled = False
-        keys_pressed = {key: False for key in keys_pressed}
+        keys_pressed.clear()
         blink_start_time = time.time()
 
-    if blinking and blink_start_time and current_time - blink_start_time >= 2:
+    if blinking and blink_start_time and current_time - blink_start_time >= RULES["blink_lock"]:
         keys_enabled = True
 
-    for event in pygame.event.get():
+    if blinking:
+        blink_mask = blink_noise.next_mask()
+
+    if keys_enabled and not blinking:
+        if keys_pressed[pygame.K_w]: move_player(0, -1)
+        if keys_pressed[pygame.K_s]: move_player(0, 1)
+        if keys_pressed[pygame.K_a]: move_player(-1, 0)
+        if keys_pressed[pygame.K_d]: move_player(1, 0)
+    keys_pressed.end_tick()
+
+# Logic runs at a fixed tick; input and drawing run at the display frame rate
+running = True
+timestep = FixedTimestep()
+scheduler = FrameScheduler(target_fps(), report=stats_requested())
+
+while running:
+    for event in scheduler.next_events():
         if event.type == pygame.QUIT:
             running = False
         elif event.type == pygame.KEYDOWN:
@@ -396,17 +285,15 @@ while running:
                 last_teleport_time = time.time()
                 blinking = False
             elif not blinking and keys_enabled and event.key in keys_pressed:
-                keys_pressed[event.key] = True
+                keys_pressed.press(event.key)
         elif event.type == pygame.KEYUP:
             if event.key in keys_pressed:
-                keys_pressed[event.key] = False
+                keys_pressed.release(event.key)
 
-    if keys_enabled and not blinking:
-        if keys_pressed[pygame.K_w]: move_player(0, -1)
-        if keys_pressed[pygame.K_s]: move_player(0, 1)
-        if keys_pressed[pygame.K_a]: move_player(-1, 0)
-        if keys_pressed[pygame.K_d]: move_player(1, 0)
+    for _ in range(timestep.ticks()):
+        update()
 
-    clock.tick(10)
+    draw_maze()
+    renderer.present()
 
-pygame.quit()
\ No newline at end of file
+pygame.quit()
@@ -1,9 +1,15 @@
 import pygame
-import random
 import time
 import sys
-import os
-import cv2  # OpenCV for video handling
+import tutorial_video
+from maze_grid import WALL, PATH, EXIT
+from maze_pool import take_level_maze
+from maze_buffer import MazeDoubleBuffer
+from text_cache import render_text
+from maze_renderer import MazeRenderer, BlinkNoise
+from fixed_timestep import FixedTimestep
+from frame_scheduler import FrameScheduler, target_fps, stats_requested
+from level_prefetch import TitleCard
 
 # Initialize Pygame
 pygame.init()
@@ -11,6 +17,7 @@ pygame.init()
 # Screen settings - Increased from 600x600 to 800x800
 WIDTH, HEIGHT = 800, 800
 GRID_SIZE = 21
+MAZE_ALGORITHM = "backtracker"  # Any name registered in maze_generators
 CELL_SIZE = WIDTH // GRID_SIZE
 screen = pygame.display.set_mode((WIDTH, HEIGHT))
 pygame.display.set_caption("Quantum Maze Game")
@@ -34,129 +41,11 @@ def show_start_screen():
     text_rect = text.get_rect(center=(WIDTH // 2, HEIGHT // 2))
     screen.blit(text, text_rect)
     pygame.display.update()
-    time.sleep(4)
+    return TitleCard(4)  # Stays up while the level loads behind it
 
-# Function to show tutorial video with OpenCV
+# Function to show the tutorial video, from the frame cache once it has been played
 def show_tutorial_video():
-    # Create a start button
-    button_rect = pygame.Rect(WIDTH // 2 - 60, HEIGHT - 70, 120, 40)
-    
-    video_path = "5.mp4"
-    
-    # Check if video file exists
-    if not os.path.exists(video_path):
-        print(f"Error: Video file '{video_path}' not found.")
-        return False  # Skip video and start the game
-    
-    try:
-        # Open the video file with OpenCV
-        cap = cv2.VideoCapture(video_path)
-        if not cap.isOpened():
-            print("Error opening video file")
-            return False
-        
-        # Get video properties
-        frame_width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-        frame_height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-        fps = cap.get(cv2.CAP_PROP_FPS)
-        
-        # Calculate scaling to fit video on screen
-        max_video_height = HEIGHT - 150  # Leave more space for title and button
-        scale = min(WIDTH / frame_width, max_video_height / frame_height)
-        display_width = int(frame_width * scale)
-        display_height = int(frame_height * scale)
-        
-        # Calculate position to center video - move it down to leave space for title
-        video_x = (WIDTH - display_width) // 2
-        video_y = (HEIGHT - display_height - 100) // 2 + 30  # Add offset to push video down
-        
-        # Position for the tutorial text - ensure it's higher than the video
-        tutorial_text_y = video_y - 30
-        
-        # For controlling video timing
-        clock = pygame.time.Clock()
-        last_frame_time = time.time() * 1000  # Current time in milliseconds
-        frame_time = 1000 / fps if fps > 0 else 33  # milliseconds per frame
-        
-        running = True
-        while running:
-            # Handle events
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    cap.release()
-                    pygame.quit()
-                    sys.exit()
-                elif event.type == pygame.MOUSEBUTTONDOWN:
-                    if button_rect.collidepoint(event.pos):
-                        running = False  # Start the game
-            
-            # Strictly control frame timing to ensure constant playback speed
-            current_time = time.time() * 1000
-            if current_time - last_frame_time >= frame_time:
-                # Read the next frame
-                ret, frame = cap.read()
-                
-                # If the video ended, loop back to beginning
-                if not ret:
-                    cap.set(cv2.CAP_PROP_POS_FRAMES, 0)  # Rewind to beginning
-                    ret, frame = cap.read()
-                    if not ret:  # If still can't read, there's a problem
-                        break
-                
-                # Apply rotation (90 degrees clockwise) and vertical flip transformations
-                # 1. Rotate 90 degrees clockwise
-                # Apply rotation (90 degrees counterclockwise two times)
-                frame = cv2.rotate(frame, cv2.ROTATE_90_COUNTERCLOCKWISE)  # First rotation
-                 # Second rotation
-
-                # 2. Flip vertically (up/down)
-                frame = cv2.flip(frame, 0)
-                
-                # Convert OpenCV BGR to RGB for Pygame
-                frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                
-                # Resize for display
-                frame = cv2.resize(frame, (display_width, display_height))
-                
-                # Convert to Pygame surface
-                video_surf = pygame.Surface((display_width, display_height))
-                pygame.surfarray.blit_array(video_surf, frame)
-                
-                # Clear screen
-                screen.fill(BLACK)
-                
-                # Add "Tutorial - Level 5" text - draw this BEFORE the video
-                tutorial_text = font.render("Tutorial - Level 5", True, WHITE)
-                tutorial_text_rect = tutorial_text.get_rect(center=(WIDTH // 2, tutorial_text_y))
-                screen.blit(tutorial_text, tutorial_text_rect)
-                
-                # Display video frame
-                screen.blit(video_surf, (video_x, video_y))
-                
-                # Draw start button
-                mouse_pos = pygame.mouse.get_pos()
-                button_color = BUTTON_HOVER if button_rect.collidepoint(mouse_pos) else BUTTON_COLOR
-                pygame.draw.rect(screen, button_color, button_rect)
-                button_text = button_font.render("Start", True, BLACK)
-                text_rect = button_text.get_rect(center=button_rect.center)
-                screen.blit(button_text, text_rect)
-                
-                pygame.display.update()
-                
-                # Update the last frame time
-                last_frame_time = current_time
-            
-            # Only tick at a high rate to handle events responsively,
-            # but actual frame display is controlled by our manual timing
-            clock.tick(60)
-        
-        # Clean up
-        cap.release()
-        return True
-        
-    except Exception as e:
-        print(f"Error playing video: {e}")
-        return False  # Skip video and start the game
+    return tutorial_video.show_tutorial_video(screen, "5.mp4", "Tutorial - Level 5", font, button_font, tutorial)
 
 # Function to display the end screen with a button
 def show_end_screen():
@@ -259,67 +148,50 @@ def show_end_screen():
                 sys.exit()
 
 
-# Generate Maze
-def generate_maze():
-    maze = [[0 for _ in range(GRID_SIZE)] for _ in range(GRID_SIZE)]
-    stack = [(random.randint(0, GRID_SIZE // 2) * 2, random.randint(0, GRID_SIZE // 2) * 2)]  # Start at a random even cell
-    visited = set(stack)
+# Show start screen before game begins; the tutorial and the mazes load while it is up
+title_card = show_start_screen()
+tutorial = tutorial_video.preload(screen, "5.mp4")
 
-    directions = [(0, 2), (2, 0), (0, -2), (-2, 0)]
-    while stack:
-        x, y = stack[-1]
-        random.shuffle(directions)
-        found = False
-        for dx, dy in directions:
-            nx, ny = x + dx, y + dy
-            if 0 <= nx < GRID_SIZE and 0 <= ny < GRID_SIZE and (nx, ny) not in visited:
-                maze[y][x] = 1  # Mark as path
-                maze[ny][nx] = 1  # Mark new position as path
-                maze[y + dy // 2][x + dx // 2] = 1  # Break the wall between
-                stack.append((nx, ny))
-                visited.add((nx, ny))
-                found = True
-                break
-        if not found:
-            stack.pop()
+# Generate Maze
+maze_count = 0  # Every superposition collapse draws the next maze of the seed
 
-    # Ensure start and exit points are open
-    maze[0][0] = 1  # Start position
-    maze[GRID_SIZE - 1][GRID_SIZE - 1] = 3  # Exit point
-    return maze
+def generate_maze():
+    global maze_count
+    maze_count += 1
+    return take_level_maze(5, GRID_SIZE, MAZE_ALGORITHM, maze_count)
 
 # Initialize player position
 player_x, player_y = 0, 0
-maze = generate_maze()
+previous_player = (player_x, player_y)  # Position before the last tick, for smooth drawing
+maze_buffer = MazeDoubleBuffer(generate_maze)  # The next maze is always being built in the background
+maze = maze_buffer.front
 start_time = time.time()
 
-def draw_maze(blink=False):
-    for row in range(GRID_SIZE):
-        for col in range(GRID_SIZE):
-            if blink:
-                color = random.choice([WHITE, BLACK])  # Random blinking effect
-            else:
-                color = WHITE if maze[row][col] == 1 else BLACK
-            pygame.draw.rect(screen, color, (col * CELL_SIZE, row * CELL_SIZE, CELL_SIZE, CELL_SIZE))
+# The settled maze is cached in the renderer; a swap repaints only the cells that changed
+renderer = MazeRenderer(screen, maze, CELL_SIZE, {PATH: WHITE, EXIT: GREEN})
+blink_noise = BlinkNoise(maze.cells.shape, ring_size=16)  # Precomputed superposition flicker
+blink_mask = None  # Flicker of the current tick
 
-            # Draw the exit in green
-            if maze[row][col] == 3:
-                pygame.draw.rect(screen, GREEN, (col * CELL_SIZE, row * CELL_SIZE, CELL_SIZE, CELL_SIZE))
+def draw_maze(blink=False):
+    renderer.begin_frame()
+    if blink:
+        # Random blinking effect over every cell; the exit stays green
+        renderer.draw_noise(blink_mask, (WALL, PATH), WHITE, BLACK)
 
     # Draw the player in blue (after the maze is drawn)
-    pygame.draw.rect(screen, BLUE, (player_x * CELL_SIZE, player_y * CELL_SIZE, CELL_SIZE, CELL_SIZE))
+    renderer.draw_moving_cell(previous_player, (player_x, player_y), timestep.alpha, BLUE)
 
     # Draw the timer
     elapsed_time = int(time.time() - start_time)
-    timer_text = font.render(f"Time: {elapsed_time}s", True, RED)
-    screen.blit(timer_text, (10, 10))
+    timer_text = render_text(font, f"Time: {elapsed_time}s", RED)
+    renderer.blit(timer_text, (10, 10))
 
 def move_player(dx, dy):
     global player_x, player_y, start_time
     new_x, new_y = player_x + dx, player_y + dy
-    if 0 <= new_x < GRID_SIZE and 0 <= new_y < GRID_SIZE and maze[new_y][new_x] in [1, 3]:
+    if maze.is_walkable(new_x, new_y):
         player_x, player_y = new_x, new_y
-        if maze[new_y][new_x] == 3:
+        if maze[new_y, new_x] == EXIT:
             print(f"You reached the exit in {int(time.time() - start_time)} seconds!")
             show_end_screen()  # Show end screen with the button
             pygame.quit()
@@ -328,36 +200,42 @@ def move_player(dx, dy):
 direction = None
 blinking = False
 running = True
-clock = pygame.time.Clock()
 
 def toggle_superposition():
-    global blinking
+    global blinking, blink_mask
     blinking = True
-    pygame.time.set_timer(pygame.USEREVENT, 200)
+    blink_mask = blink_noise.next_mask()
 
 def stop_superposition():
     global blinking, maze
     blinking = False
-    pygame.time.set_timer(pygame.USEREVENT, 0)
-    maze = generate_maze()
+    # Measurement: take the pre-built back maze and repaint the cells that differ
+    maze, changed = maze_buffer.swap()
+    renderer.set_maze(maze, changed.tolist())
 
-# Show start screen before game begins
-show_start_screen()
+# Keep the start screen up for its full time; everything above loaded behind it
+title_card.hold()
 
 # Show tutorial video before game begins
 # Reset start_time after the tutorial video
 if show_tutorial_video():
     start_time = time.time()
 
-while running:
-    screen.fill(BLACK)
-    draw_maze(blinking)
-    pygame.display.update()
-
-    if direction and not blinking:
+def update():
+    """One simulation tick: walk in the held direction, or flicker while in superposition"""
+    global previous_player, blink_mask
+    previous_player = (player_x, player_y)
+    if blinking:
+        blink_mask = blink_noise.next_mask()
+    elif direction:
         move_player(*direction)
 
-    for event in pygame.event.get():
+# Logic runs at a fixed tick; input and drawing run at the display frame rate
+timestep = FixedTimestep()
+scheduler = FrameScheduler(target_fps(), report=stats_requested())
+
+while running:
+    for event in scheduler.next_events():
         if event.type == pygame.QUIT:
             running = False
         elif event.type == pygame.KEYDOWN:
@@ -373,9 +251,12 @@ while running:
         elif event.type == pygame.KEYUP:
             direction = None
             toggle_superposition()
-        elif event.type == pygame.USEREVENT and blinking:
-            draw_maze(blink=True)
-
-    clock.tick(10)
+    
+    for _ in range(timestep.ticks()):
+        update()
+    
+    draw_maze(blinking)
+    renderer.present()
 
-pygame.quit()
\ No newline at end of file
+maze_buffer.close()
+pygame.quit()
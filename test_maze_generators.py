@@ -0,0 +1,21 @@
+import random
+
+import pytest
+
+from maze_generators import GENERATORS, build_maze
+from maze_grid import PATH, EXIT
+
+@pytest.mark.parametrize("algorithm", sorted(GENERATORS))
+@pytest.mark.parametrize("grid_size", [0, -1, 2, 22])
+def test_build_maze_rejects_even_and_non_positive_sizes(algorithm, grid_size):
+    with pytest.raises(ValueError):
+        build_maze(grid_size, algorithm, random.Random(0))
+
+@pytest.mark.parametrize("algorithm", sorted(GENERATORS))
+@pytest.mark.parametrize("grid_size", [1, 21])
+def test_build_maze_accepts_odd_sizes(algorithm, grid_size):
+    maze = build_maze(grid_size, algorithm, random.Random(0))
+    assert maze.grid_size == grid_size
+    assert maze[grid_size - 1, grid_size - 1] == EXIT
+    if grid_size > 1:
+        assert maze[0, 0] == PATH
@@ -0,0 +1,38 @@
+# text_cache.py - Rendered text kept around so HUD text costs a blit instead of a rasterization
+from collections import OrderedDict
+
+MAX_CACHED_TEXTS = 256
+
+class TextCache:
+    """Rendered text surfaces keyed by (font, string, colour) with LRU eviction"""
+    def __init__(self, max_entries=MAX_CACHED_TEXTS):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def render(self, font, text, color, antialias=True):
+        """Same as font.render(text, antialias, color), rasterized only on a cache miss"""
+        key = (font, text, color, antialias)
+        surface = self.entries.get(key)
+        if surface is not None:
+            self.entries.move_to_end(key)
+            return surface
+        surface = self.entries[key] = font.render(text, antialias, color)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+        return surface
+
+_cache = None
+
+def get_text_cache():
+    """Process-wide text cache"""
+    global _cache
+    if _cache is None:
+        _cache = TextCache()
+    return _cache
+
+def render_text(font, text, color, antialias=True):
+    """Cached font.render"""
+    return get_text_cache().render(font, text, color, antialias)
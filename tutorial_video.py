@@ -0,0 +1,647 @@
+# tutorial_video.py - Level tutorial videos, decoded once into a memory-mapped frame cache
+import glob
+import hashlib
+import json
+import os
+import queue
+import re
+import shutil
+import subprocess
+import sys
+import threading
+import time
+
+import numpy as np
+import pygame
+
+CACHE_DIR = "tutorial_cache"
+CACHE_FORMAT = 2  # Bump when the stored frame layout changes
+STALE_TEMP_SECONDS = 600  # Writers add frames as they play; a temp file idle this long was left by a dead process
+QUEUE_FRAMES = 8  # Decoded frames the producer thread may run ahead of the display
+PIXEL_ORDER = "BGR"  # OpenCV's channel order; the Surface format does the swap during the screen blit
+
+# Set to "ffmpeg" or "opencv" to pick the decoder, e.g.
+#   QUANTUM_MAZE_VIDEO_BACKEND=ffmpeg python GAME.py
+# By default OpenCV decodes, with a local ffmpeg only as the fallback. The
+# backends scale differently (ffmpeg's scale filter is bicubic, cv2.resize
+# bilinear), so each keeps its own cache entries, and a requested backend
+# only plays frames it made itself.
+BACKEND_ENV = "QUANTUM_MAZE_VIDEO_BACKEND"
+
+# Decoded frames are only cached when asked, with the cache's size limit in MB, e.g.
+#   QUANTUM_MAZE_VIDEO_CACHE=2048 python GAME.py
+# Frames are stored uncompressed: at 650x650 (an 800x800 window) the five
+# tutorials take 290-583 MB each, about 2 GB in all. Past the limit the
+# oldest entries are deleted, and a video that alone exceeds it is not cached.
+CACHE_ENV = "QUANTUM_MAZE_VIDEO_CACHE"
+NO_WINDOW = getattr(subprocess, "CREATE_NO_WINDOW", 0)  # Keeps ffmpeg from flashing a console on Windows
+
+# Cache entry file names: {stem}-{hash}-{width}x{height}-{backend}.rgb/.json
+# (entries from before the backend suffix have none)
+ENTRY_NAME = re.compile(r"(?P<stem>.+)-(?P<hash>[0-9a-f]{16})-(?P<box>\d+x\d+)(?:-(?P<backend>[a-z]+))?\.(?:rgb|json)")
+
+BLACK = (0, 0, 0)
+WHITE = (255, 255, 255)
+BUTTON_COLOR = (200, 200, 200)
+BUTTON_HOVER = (150, 150, 150)
+
+def cache_limit():
+    """Frame cache size limit in bytes requested through the environment, or None if caching is off"""
+    value = os.environ.get(CACHE_ENV, "").strip()
+    if value in ("", "0"):
+        return None
+    try:
+        megabytes = int(value)
+    except ValueError:
+        megabytes = 0
+    if megabytes <= 0:
+        print(f"Ignoring invalid {CACHE_ENV} value: {value!r}")
+        return None
+    return megabytes << 20
+
+def source_hash(path):
+    """SHA-256 of a video file, so an edited video never plays stale frames"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def fit_size(frame_size, box):
+    """Largest size with the frame's aspect ratio that fits in box"""
+    (frame_width, frame_height), (box_width, box_height) = frame_size, box
+    scale = min(box_width / frame_width, box_height / frame_height)
+    return int(frame_width * scale), int(frame_height * scale)
+
+def video_box(window_size):
+    """Space for the video in a window, leaving room for the title and the button"""
+    width, height = window_size
+    return width, height - 150
+
+def cache_base(video_path, box):
+    """Cache file path without backend and extension for a video fitted into box"""
+    stem = os.path.splitext(os.path.basename(video_path))[0]
+    return os.path.join(CACHE_DIR, f"{stem}-{source_hash(video_path)[:16]}-{box[0]}x{box[1]}")
+
+def display_frame(frame, size, out=None):
+    """OpenCV BGR frame -> BGR rows at the display size, written into out if given.
+
+    This is the whole transform: the old rotate plus flip was a transpose
+    that blit_array's [x, y] indexing undid again, and the colour swap is
+    left to the Surface format (see PIXEL_ORDER). One resize, one copy.
+    """
+    import cv2  # Only the OpenCV backend gets here, see OpenCVDecoder
+    return cv2.resize(frame, size, dst=out)
+
+def frame_surface(frame, size):
+    """Surface sharing frame's memory: writes to the array show up in it, nothing is copied"""
+    return pygame.image.frombuffer(frame, size, PIXEL_ORDER)
+
+class FrameCache:
+    """Display-ready frames of one video, memory-mapped from the cache.
+
+    The frames live in a raw (count, height, width, 3) uint8 file next to a
+    JSON description; the JSON is written last, so a half-written cache is
+    never picked up.
+    """
+    def __init__(self, frames, fps):
+        self.frames = frames
+        self.fps = fps
+        self.size = (frames.shape[2], frames.shape[1])
+
+    @classmethod
+    def load(cls, video_path, box):
+        """Cached frames of a video fitted into box, or None if it has not been cached yet"""
+        try:
+            base = cache_base(video_path, box)
+        except OSError:
+            return None
+        for backend in cache_backends():
+            try:
+                with open(f"{base}-{backend}.json") as f:
+                    meta = json.load(f)
+                if meta.get("format") != CACHE_FORMAT:
+                    continue
+                width, height = meta["size"]
+                frames = np.memmap(f"{base}-{backend}.rgb", dtype=np.uint8, mode="r",
+                                   shape=(meta["frames"], height, width, 3))
+            except (OSError, ValueError, KeyError):
+                continue
+            return cls(frames, meta["fps"])
+        return None
+
+    def __len__(self):
+        return len(self.frames)
+
+    def warm(self, count):
+        """Page the first count frames into memory so the first seconds never wait on the disk"""
+        self.frames[:count, :, 0, 0].max()  # One byte per row touches every page
+
+    def frame_at(self, index):
+        """Frame index of the endlessly looping video as a Surface over the mapped file"""
+        return frame_surface(self.frames[index % len(self.frames)], self.size)
+
+    def close(self):
+        """Unmap the file: Windows cannot replace or remove a cache file while it is mapped"""
+        mapping = getattr(self.frames, "_mmap", None)
+        self.frames = None
+        if mapping is not None:
+            try:
+                mapping.close()
+            except BufferError:
+                pass  # A Surface still shows one of its frames; the mapping goes with the Surface
+
+def remove_stale_temps():
+    """Delete half-written cache entries of processes that died or were killed mid-write"""
+    cutoff = time.time() - STALE_TEMP_SECONDS
+    for temp in glob.glob(os.path.join(glob.escape(CACHE_DIR), "*.tmp")):
+        try:
+            if os.path.getmtime(temp) < cutoff:
+                os.remove(temp)
+        except OSError:
+            pass  # Gone already, or still open in another process on Windows
+
+def remove_entry(base):
+    """Delete a cache entry, its description first so it is never half visible.
+
+    Returns False if it is still in use (mapped by a player on Windows).
+    """
+    for path in (base + ".json", base + ".rgb"):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        except OSError:
+            return False
+    return True
+
+def trim_cache(limit, keep=None):
+    """Delete the oldest cache entries until the cache fits in limit bytes; the entry keep stays"""
+    entries = {}  # base -> [bytes, time last written]
+    for path in glob.glob(os.path.join(glob.escape(CACHE_DIR), "*")):
+        base, extension = os.path.splitext(path)
+        if extension not in (".rgb", ".json"):
+            continue
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        entry = entries.setdefault(base, [0, 0])
+        entry[0] += stat.st_size
+        entry[1] = max(entry[1], stat.st_mtime)
+    total = sum(size for size, _ in entries.values())
+    for base, (size, _) in sorted(entries.items(), key=lambda item: item[1][1]):
+        if total <= limit:
+            break
+        if base != keep and remove_entry(base):
+            total -= size
+
+class FrameCacheWriter:
+    """Appends display frames to a new cache entry and publishes it when complete"""
+    def __init__(self, video_path, box, size, fps, backend, limit):
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        remove_stale_temps()
+        self.base = f"{cache_base(video_path, box)}-{backend}"
+        self.stem = os.path.splitext(os.path.basename(video_path))[0]
+        self.backend = backend
+        self.temp = f"{self.base}.{os.getpid()}.tmp"  # Other processes may be caching the same video
+        self.file = open(self.temp, "wb")
+        self.size = size
+        self.fps = fps
+        self.limit = limit
+        self.count = 0
+
+    def add(self, frame):
+        """Append a frame; False if the entry would outgrow the whole cache limit"""
+        if (self.count + 1) * frame.nbytes > self.limit:
+            return False
+        self.file.write(frame)
+        self.count += 1
+        return True
+
+    def outdated_entries(self):
+        """Other entries of this video and backend, for an older video file or another box size"""
+        outdated = set()
+        for path in glob.glob(os.path.join(glob.escape(CACHE_DIR), "*")):
+            name = ENTRY_NAME.fullmatch(os.path.basename(path))
+            if name and name["stem"] == self.stem and name["backend"] == self.backend:
+                outdated.add(os.path.splitext(path)[0])
+        outdated.discard(self.base)
+        return outdated
+
+    def finish(self):
+        """Publish the cache entry and drop the entries it replaces"""
+        self.file.close()
+        for base in self.outdated_entries():
+            remove_entry(base)  # If still mapped by a player on Windows, the next writer retries
+        os.replace(self.temp, self.base + ".rgb")
+        meta = {"format": CACHE_FORMAT, "frames": self.count, "size": list(self.size), "fps": self.fps}
+        with open(self.temp, "w") as f:
+            json.dump(meta, f)
+        os.replace(self.temp, self.base + ".json")
+        trim_cache(self.limit, keep=self.base)
+
+    def abort(self):
+        self.file.close()
+        os.remove(self.temp)
+
+class VideoDecoder:
+    """Base class of the decoder backends: display frames of a video, looping at the end.
+
+    Backends write each frame at display size into a ring of ring_size
+    buffers, each wrapped once in a long-lived Surface; next_frame() hands
+    out those Surfaces, so a frame is never allocated or copied after the
+    decoder produced it. A Surface is overwritten ring_size frames later,
+    which bounds how many a consumer may hold.
+
+    When caching is on (see CACHE_ENV), the first full pass is written to
+    the frame cache as it goes, so every later viewing is served by
+    FrameCache without decoding anything.
+    Subclasses name themselves in BACKENDS, open the video, then call
+    this __init__ with what they found, and implement _read_into, _rewind
+    and _release.
+    """
+    name = None
+
+    def __init__(self, video_path, box, frame_size, fps, ring_size=1):
+        self.fps = fps if fps > 0 else 30
+        self.size = fit_size(frame_size, box)
+        self.ring = np.empty((ring_size, self.size[1], self.size[0], 3), np.uint8)
+        self.surfaces = [frame_surface(frame, self.size) for frame in self.ring]
+        self.position = 0
+        self.writer = None
+        limit = cache_limit()
+        if limit is not None:
+            try:
+                self.writer = FrameCacheWriter(video_path, box, self.size, self.fps, self.name, limit)
+            except OSError as e:
+                print(f"Not caching tutorial frames: {e}")
+
+    def _read_into(self, out):
+        """Write the next frame at display size into out; False at the end of the video"""
+        raise NotImplementedError
+
+    def _rewind(self):
+        raise NotImplementedError
+
+    def _release(self):
+        raise NotImplementedError
+
+    def next_frame(self):
+        """Surface showing the next frame, or None if the video cannot be read"""
+        frame = self.ring[self.position]
+        if not self._read_into(frame):
+            if self.writer is not None and self.writer.count:
+                self.writer.finish()
+                self.writer = None
+            self._rewind()
+            if not self._read_into(frame):
+                return None
+        if self.writer is not None and not self.writer.add(frame):
+            print(f"Not caching tutorial frames: the video is larger than the {CACHE_ENV} limit")
+            self.writer.abort()
+            self.writer = None
+        surface = self.surfaces[self.position]
+        self.position = (self.position + 1) % len(self.ring)
+        return surface
+
+    def close(self):
+        self._release()
+        if self.writer is not None:
+            self.writer.abort()  # Stopped before the end: nothing complete to keep
+            self.writer = None
+
+class OpenCVDecoder(VideoDecoder):
+    """Decodes with OpenCV into one reused buffer and resizes from there into the ring.
+
+    OpenCV is imported here rather than at the top of the module: loading it
+    takes longer than the rest of a level's startup, and a level whose video
+    is cached, missing or skipped never needs it.
+    """
+    name = "opencv"
+
+    def __init__(self, video_path, box, ring_size=1):
+        import cv2
+        self.cv2 = cv2
+        self.cap = cv2.VideoCapture(video_path)
+        if not self.cap.isOpened():
+            raise OSError(f"Cannot open video file '{video_path}'")
+        frame_size = (int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT)))
+        self.decoded = None  # cap.read fills this buffer in place once it exists
+        super().__init__(video_path, box, frame_size, self.cap.get(cv2.CAP_PROP_FPS), ring_size)
+
+    def _read_into(self, out):
+        ret, self.decoded = self.cap.read(self.decoded)
+        if ret:
+            display_frame(self.decoded, self.size, out)
+        return ret
+
+    def _rewind(self):
+        self.cap.set(self.cv2.CAP_PROP_POS_FRAMES, 0)  # Rewind to beginning
+
+    def _release(self):
+        self.cap.release()
+
+class FFmpegDecoder(VideoDecoder):
+    """Reads raw frames piped from a local ffmpeg, which also scales them to display size.
+
+    Nothing is imported and nothing is decoded in this process: every frame
+    is one readinto() from the pipe straight into the ring. Rewinding
+    restarts ffmpeg.
+    """
+    name = "ffmpeg"
+
+    def __init__(self, video_path, box, ring_size=1):
+        ffmpeg, ffprobe = shutil.which("ffmpeg"), shutil.which("ffprobe")
+        if ffmpeg is None or ffprobe is None:
+            raise OSError("ffmpeg and ffprobe are not both on the PATH")
+        try:
+            probe = subprocess.run(
+                [ffprobe, "-v", "error", "-select_streams", "v:0",
+                 "-show_entries", "stream=width,height,avg_frame_rate", "-of", "json", video_path],
+                capture_output=True, text=True, check=True, creationflags=NO_WINDOW)
+            stream = json.loads(probe.stdout)["streams"][0]
+            frames, _, seconds = stream["avg_frame_rate"].partition("/")
+            seconds = float(seconds or 1)
+            fps = float(frames) / seconds if seconds else 0
+            frame_size = (int(stream["width"]), int(stream["height"]))
+        except (subprocess.SubprocessError, ValueError, KeyError, IndexError) as e:
+            raise OSError(f"Cannot probe video file '{video_path}': {e}") from e
+        width, height = fit_size(frame_size, box)
+        self.command = [ffmpeg, "-v", "error", "-nostdin", "-i", video_path,
+                        "-vf", f"scale={width}:{height}",
+                        "-f", "rawvideo", "-pix_fmt", PIXEL_ORDER.lower() + "24", "-"]
+        self._start()
+        super().__init__(video_path, box, frame_size, fps, ring_size)
+
+    def _start(self):
+        self.process = subprocess.Popen(self.command, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE,
+                                        creationflags=NO_WINDOW)
+
+    def _read_into(self, out):
+        view = memoryview(out).cast("B")
+        filled = 0
+        while filled < len(view):
+            count = self.process.stdout.readinto(view[filled:])
+            if not count:
+                return False
+            filled += count
+        return True
+
+    def _rewind(self):
+        self._release()
+        self._start()
+
+    def _release(self):
+        if self.process is not None:
+            self.process.kill()
+            self.process.wait()
+            self.process.stdout.close()
+            self.process = None
+
+BACKENDS = {backend.name: backend for backend in (OpenCVDecoder, FFmpegDecoder)}  # Default order
+
+def requested_backend():
+    """Backend named in the environment, or None to use the default order"""
+    value = os.environ.get(BACKEND_ENV, "").strip().lower()
+    return value if value in BACKENDS else None
+
+def video_backends():
+    """Decoder backends to try in order: the one requested through the environment first"""
+    requested = requested_backend()
+    value = os.environ.get(BACKEND_ENV, "").strip()
+    if value and requested is None:
+        print(f"Ignoring invalid {BACKEND_ENV} value: {value!r}")
+    return sorted(BACKENDS, key=lambda name: name != requested)
+
+def cache_backends():
+    """Backends whose cached frames may be played: only the requested one, else any"""
+    requested = requested_backend()
+    return [requested] if requested else list(BACKENDS)
+
+def open_decoder(video_path, box, ring_size=1):
+    """A decoder from the first backend that can open the video"""
+    errors = []
+    for name in video_backends():
+        try:
+            decoder = BACKENDS[name](video_path, box, ring_size)
+        except (OSError, ImportError) as e:
+            errors.append(f"{name}: {e}")
+            continue
+        requested = requested_backend()
+        if requested is not None and name != requested:
+            # Its frames are cached under its own name, which the requested backend never plays
+            print(f"Requested video backend unavailable ({'; '.join(errors)}), decoding with {name}")
+        return decoder
+    raise OSError(f"No video backend can play '{video_path}' ({'; '.join(errors)})")
+
+class FrameProducer:
+    """Runs a VideoDecoder on a background thread, up to queue_frames ahead of the display.
+
+    Decoding, resizing and rewinding at the end all happen on the producer
+    thread, which blocks once the queue is full. The UI thread only takes
+    finished frames: frame_at() never waits, and frames the display has
+    already fallen behind are dropped rather than shown late.
+    """
+    def __init__(self, decoder, queue_frames=QUEUE_FRAMES):
+        # The decoder's ring must outlast the queue, the pending and the shown frame
+        # and the one being decoded, or a Surface would be overwritten while in use
+        if len(decoder.ring) < queue_frames + 3:
+            raise ValueError(f"Decoder ring of {len(decoder.ring)} frames is too small for a queue of {queue_frames}")
+        self.decoder = decoder
+        self.fps = decoder.fps
+        self.size = decoder.size
+        self.queue = queue.Queue(queue_frames)
+        self.stopping = threading.Event()
+        self.pending = None  # (index, frame) taken from the queue but not due yet
+        self.dropped = 0
+        self.thread = threading.Thread(target=self._produce, name="tutorial-decoder", daemon=True)
+        self.thread.start()
+
+    def _produce(self):
+        index = 0
+        while not self.stopping.is_set():
+            try:
+                frame = self.decoder.next_frame()
+            except Exception as e:
+                print(f"Error decoding video: {e}")
+                frame = None
+            item = None if frame is None else (index, frame)  # None marks the end of the video
+            while not self.stopping.is_set():
+                try:
+                    self.queue.put(item, timeout=0.1)
+                    break
+                except queue.Full:
+                    pass
+            if item is None:
+                return
+            index += 1
+
+    def frame_at(self, index):
+        """Newest decoded frame up to index, or None if none has arrived since the last call.
+
+        Raises EOFError once the decoder cannot produce any more frames.
+        """
+        latest = None
+        while True:
+            if self.pending is None:
+                try:
+                    self.pending = self.queue.get_nowait()
+                except queue.Empty:
+                    return latest
+                if self.pending is None:
+                    raise EOFError("No more video frames")
+            if self.pending[0] > index:
+                return latest
+            if latest is not None:
+                self.dropped += 1
+            latest = self.pending[1]
+            self.pending = None
+
+    def close(self):
+        self.stopping.set()
+        self.thread.join()
+        self.decoder.close()
+
+def build_cache(video_path, box, stop=None):
+    """Decode a whole video into the frame cache; returns the cache, or None if it was not written.
+
+    Nothing is decoded while caching is off. Setting the stop event abandons
+    the build after the current frame.
+    """
+    if cache_limit() is None:
+        return None
+    decoder = open_decoder(video_path, box)
+    try:
+        while decoder.writer is not None and not (stop is not None and stop.is_set()):
+            if decoder.next_frame() is None:
+                break
+    finally:
+        decoder.close()
+    return FrameCache.load(video_path, box)
+
+def open_video(video_path, box):
+    """Frame source for a video fitted into box: the cache if there is one, a decoder thread otherwise"""
+    cache = FrameCache.load(video_path, box)
+    if cache is not None:
+        return cache
+    return FrameProducer(open_decoder(video_path, box, ring_size=QUEUE_FRAMES + 3))
+
+def preload(screen, video_path):
+    """Open a tutorial video ahead of show_tutorial_video, e.g. behind a title card.
+
+    A decoder starts filling its frame queue straight away. Returns None
+    if the video is missing or cannot be opened; show_tutorial_video then
+    reports why.
+    """
+    if not os.path.exists(video_path):
+        return None
+    try:
+        return open_video(video_path, video_box(screen.get_size()))
+    except Exception:
+        return None
+
+def show_tutorial_video(screen, video_path, title, font, button_font, video=None):
+    """Loop a level's tutorial video until Start is clicked.
+
+    video is what preload returned for this video, if it was opened early.
+    Returns False when there is no playable video, so the level just starts.
+    """
+    width, height = screen.get_size()
+    # Create a start button
+    button_rect = pygame.Rect(width // 2 - 60, height - 70, 120, 40)
+
+    # Check if video file exists
+    if not os.path.exists(video_path):
+        print(f"Error: Video file '{video_path}' not found.")
+        return False  # Skip video and start the game
+
+    if video is None:
+        try:
+            video = open_video(video_path, video_box(screen.get_size()))
+        except Exception as e:
+            print(f"Error opening video file: {e}")
+            return False
+
+    try:
+        display_width, display_height = video.size
+
+        # Centre the video, pushed down to leave space for the title above it
+        video_x = (width - display_width) // 2
+        video_y = (height - display_height - 100) // 2 + 30
+        tutorial_text = font.render(title, True, WHITE)
+        tutorial_text_rect = tutorial_text.get_rect(center=(width // 2, video_y - 30))
+        button_text = button_font.render("Start", True, BLACK)
+
+        video_surf = None
+
+        # Frames are picked by the time since the start, so playback keeps its speed
+        # even when frames have to be dropped
+        clock = pygame.time.Clock()
+        start_time = time.time()
+        shown = -1
+
+        running = True
+        while running:
+            # Handle events
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    pygame.quit()
+                    sys.exit()
+                elif event.type == pygame.MOUSEBUTTONDOWN:
+                    if button_rect.collidepoint(event.pos):
+                        running = False  # Start the game
+
+            due = int((time.time() - start_time) * video.fps)
+            if due > shown:
+                try:
+                    surface = video.frame_at(due)
+                except EOFError:  # The video cannot be read
+                    break
+                if surface is not None or video_surf is None:
+                    if surface is not None:
+                        video_surf = surface
+                        shown = due
+
+                    screen.fill(BLACK)
+                    screen.blit(tutorial_text, tutorial_text_rect)
+                    if video_surf is not None:
+                        screen.blit(video_surf, (video_x, video_y))
+
+                    # Draw start button
+                    mouse_pos = pygame.mouse.get_pos()
+                    button_color = BUTTON_HOVER if button_rect.collidepoint(mouse_pos) else BUTTON_COLOR
+                    pygame.draw.rect(screen, button_color, button_rect)
+                    screen.blit(button_text, button_text.get_rect(center=button_rect.center))
+
+                    pygame.display.update()
+
+            # Only tick at a high rate to handle events responsively,
+            # but actual frame display is controlled by our manual timing
+            clock.tick(60)
+
+        return True
+
+    except Exception as e:
+        print(f"Error playing video: {e}")
+        return False  # Skip video and start the game
+
+    finally:
+        video.close()
+
+if __name__ == "__main__":
+    # Fill the cache ahead of time: QUANTUM_MAZE_VIDEO_CACHE=2048 python tutorial_video.py [width height]
+    if cache_limit() is None:
+        sys.exit(f"Set {CACHE_ENV} to the cache size limit in MB to fill the cache, e.g. {CACHE_ENV}=2048")
+    box = video_box(tuple(map(int, sys.argv[1:3])) if len(sys.argv) > 2 else (800, 800))
+    for level in range(1, 6):
+        path = f"{level}.mp4"
+        if not os.path.exists(path) or FrameCache.load(path, box) is not None:
+            continue
+        start = time.perf_counter()
+        cache = build_cache(path, box)
+        if cache is None:
+            print(f"Could not cache {path}")
+        else:
+            print(f"Cached {path} at {cache.size[0]}x{cache.size[1]} in {time.perf_counter() - start:.1f}s")
+            cache.close()
@@ -0,0 +1,137 @@
+# video_benchmark.py - Per-frame copies and time of the tutorial video paths, old and new
+# Usage: python video_benchmark.py [video] [--frames N]
+import os
+import sys
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")  # Runs without a window
+
+import cv2
+import numpy as np
+import pygame
+
+from tutorial_video import FrameCache, display_frame, fit_size, frame_surface
+
+WINDOW = (800, 800)
+BOX = (WINDOW[0], WINDOW[1] - 150)  # The player leaves room for the title and the button
+DEFAULT_FRAMES = 120
+REPEATS = 3
+
+def original_path(size):
+    """The per-level player before the frame cache: five full-frame copies"""
+    def rotate(frame):
+        return cv2.rotate(frame, cv2.ROTATE_90_COUNTERCLOCKWISE)
+    def flip(frame):
+        return cv2.flip(frame, 0)
+    def to_rgb(frame):
+        return cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+    def resize(frame):
+        return cv2.resize(frame, size)
+    def new_surface(frame):
+        surface = pygame.Surface(size)
+        pygame.surfarray.blit_array(surface, frame)
+        return surface
+    return [rotate, flip, to_rgb, resize, new_surface]
+
+def rgb_path(size):
+    """Resize, colour convert, then a Surface over the result: two copies"""
+    def resize(frame):
+        return cv2.resize(frame, size)
+    def to_rgb(frame):
+        return cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+    def wrap(frame):
+        return pygame.image.frombuffer(frame, size, "RGB")
+    return [resize, to_rgb, wrap]
+
+def fused_path(size):
+    """What OpenCVDecoder does: resize into a reused buffer behind a long-lived BGR Surface"""
+    buffer = np.empty((size[1], size[0], 3), np.uint8)
+    surface = frame_surface(buffer, size)
+    def resize_into_surface(frame):
+        display_frame(frame, size, buffer)
+        return surface
+    return [resize_into_surface]
+
+# name -> (build the steps for a display size, full-frame copies the steps make)
+PATHS = {
+    "original": (original_path, 5),
+    "resize+rgb": (rgb_path, 2),
+    "fused": (fused_path, 1),
+}
+
+def read_frames(video_path, count):
+    """The first count frames of a video, decoded up front so decoding is not timed"""
+    cap = cv2.VideoCapture(video_path)
+    frames = []
+    while len(frames) < count:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frames.append(frame)
+    cap.release()
+    return frames
+
+def time_path(steps, frames, screen, pos):
+    """Best-of-REPEATS milliseconds per frame for each step and for the blit to the screen"""
+    best = [float("inf")] * (len(steps) + 1)
+    for _ in range(REPEATS):
+        totals = [0.0] * (len(steps) + 1)
+        for frame in frames:
+            for i, step in enumerate(steps):
+                start = time.perf_counter()
+                frame = step(frame)
+                totals[i] += time.perf_counter() - start
+            start = time.perf_counter()
+            screen.blit(frame, pos)
+            totals[-1] += time.perf_counter() - start
+        best = [min(b, t) for b, t in zip(best, totals)]
+    return [t * 1000 / len(frames) for t in best]
+
+def time_cache(cache, count, screen, pos):
+    """Milliseconds per frame played from the frame cache: a Surface over the mapped file, then the blit"""
+    best = float("inf")
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        for index in range(count):
+            screen.blit(cache.frame_at(index), pos)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000 / count
+
+def main(video_path, count):
+    pygame.init()
+    screen = pygame.display.set_mode(WINDOW)
+    frames = read_frames(video_path, count)
+    if not frames:
+        print(f"Cannot read video file '{video_path}'")
+        return 1
+    height, width = frames[0].shape[:2]
+    size = fit_size((width, height), BOX)
+    pos = ((WINDOW[0] - size[0]) // 2, (WINDOW[1] - size[1] - 100) // 2 + 30)
+    print(f"{video_path}: {len(frames)} frames of {width}x{height} shown at {size[0]}x{size[1]}")
+    print("copies = full-frame writes before the blit to the screen, which every path does")
+    print(f"{'path':>12} {'copies':>7} {'ms/frame':>9} {'blit ms':>8}   steps (ms)")
+
+    for name, (build, copies) in PATHS.items():
+        steps = build(size)
+        timings = time_path(steps, frames, screen, pos)
+        breakdown = ", ".join(f"{step.__name__} {ms:.2f}" for step, ms in zip(steps, timings))
+        print(f"{name:>12} {copies:>7} {sum(timings):>9.2f} {timings[-1]:>8.2f}   {breakdown}")
+
+    cache = FrameCache.load(video_path, BOX)
+    if cache is None:
+        print(f"{'cache':>12}  (no frame cache for {video_path}; run tutorial_video.py with QUANTUM_MAZE_VIDEO_CACHE set)")
+    else:
+        ms = time_cache(cache, min(count, len(cache)), screen, pos)
+        print(f"{'cache':>12} {0:>7} {ms:>9.2f} {ms:>8.2f}   no decode at all")
+        cache.close()
+    pygame.quit()
+    return 0
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    count = DEFAULT_FRAMES
+    if "--frames" in args:
+        i = args.index("--frames")
+        count = int(args[i + 1])
+        del args[i:i + 2]
+    sys.exit(main(args[0] if args else "1.mp4", count))